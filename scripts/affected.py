@@ -0,0 +1,52 @@
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+
+from helpers.impact_analysis import analyze_impact, get_changed_files
+
+KINDS = ["entities", "testbenches", "sby_files", "docs"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="List the entities, testbenches, .sby files and docs affected by changed files."
+    )
+    parser.add_argument(
+        "files",
+        type=Path,
+        nargs="*",
+        help="Changed files, by default the files changed since --since.",
+    )
+    parser.add_argument(
+        "--since",
+        type=str,
+        default="HEAD",
+        help="Git revision to compare the working tree with (default: HEAD).",
+    )
+    parser.add_argument(
+        "--kind",
+        choices=KINDS,
+        default=None,
+        help="Print only the affected items of this kind, one per line (e.g. for scripting).",
+    )
+    args = parser.parse_args()
+
+    try:
+        changed_files = args.files or get_changed_files(args.since)
+    except (OSError, subprocess.CalledProcessError) as error:
+        print(f"Error: changed files could not be listed: {error}")
+        sys.exit(1)
+    impact = analyze_impact(changed_files)
+
+    if args.kind:
+        for item in getattr(impact, args.kind):
+            print(item.as_posix() if isinstance(item, Path) else item)
+        sys.exit(0)
+
+    print(f"{len(changed_files)} changed file(s), {len(impact.files)} affected VHDL/PSL file(s)")
+    for kind in KINDS:
+        items = getattr(impact, kind)
+        print(f"\n{kind.replace('_', ' ').capitalize()} ({len(items)}):")
+        for item in items:
+            print(f"  {item.as_posix() if isinstance(item, Path) else item}")
@@ -0,0 +1,98 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+
+from helpers.netlist_analysis import (
+    NETLIST_DIRECTORY,
+    ModuleReport,
+    analyze_netlist,
+    load_netlist,
+)
+
+
+def find_netlists(names: list[str]) -> list[Path]:
+    """Returns the given netlist files, the netlists kept by `synthesize.py` for the given
+    entities (all generics), or all kept netlists if no names are given."""
+
+    if not names:
+        return sorted(NETLIST_DIRECTORY.glob("*.json.gz"))
+    netlists = []
+    for name in names:
+        if Path(name).is_file():
+            netlists.append(Path(name))
+            continue
+        entity = Path(name).name
+        matches = sorted(NETLIST_DIRECTORY.glob(f"{entity}.json.gz")) + sorted(
+            NETLIST_DIRECTORY.glob(f"{entity}_*=*.json.gz")
+        )
+        if not matches:
+            print(f"No netlist of {entity} found in {NETLIST_DIRECTORY}, run synthesize.py first.")
+        netlists.extend(matches)
+    return netlists
+
+
+def print_report(report: ModuleReport, cell_types: int) -> None:
+    print(f"  Module {report.name}: {sum(report.cell_counts.values())} cells")
+    for cell_type, count in report.cell_counts.most_common(cell_types):
+        print(f"    {count:>6}  {cell_type}")
+
+    print(f"    Logic depth: {report.logic_depth}")
+    if report.critical_path:
+        path = " -> ".join(f"{name} ({cell_type})" for name, cell_type in report.critical_path)
+        print(f"      {path}")
+    if report.loop_cells:
+        print(f"    ⚠️ {report.loop_cells} cells on combinational loops (left out of the depth)")
+
+    if report.high_fanout_nets:
+        print("    Highest fanout:")
+        for net, fanout in report.high_fanout_nets:
+            print(f"    {fanout:>6}  {net}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report logic depth, fanout and cell counts of Yosys JSON netlists."
+    )
+    parser.add_argument(
+        "netlists",
+        type=str,
+        nargs="*",
+        help=f"Netlist files or entity names (netlists in {NETLIST_DIRECTORY}), all by default.",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Number of nets with the highest fanout and cell types reported per module.",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        help="Exit with a non-zero code if any module has a larger logic depth.",
+    )
+    args = parser.parse_args()
+
+    netlists = find_netlists(args.netlists)
+    if not netlists:
+        print("No netlists found.")
+        sys.exit(1)
+
+    too_deep = []
+    for netlist_path in netlists:
+        start = time.perf_counter()
+        reports = analyze_netlist(load_netlist(netlist_path), args.top)
+        elapsed = time.perf_counter() - start
+        print(f"{netlist_path} ({elapsed * 1000:.1f} ms)")
+        for report in reports:
+            print_report(report, args.top)
+            if args.max_depth is not None and report.logic_depth > args.max_depth:
+                too_deep.append(f"{netlist_path}: {report.name} ({report.logic_depth})")
+        print()
+
+    if too_deep:
+        print(f"❌ Logic depth above {args.max_depth}:")
+        for line in too_deep:
+            print(f"  {line}")
+        sys.exit(1)
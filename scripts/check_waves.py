@@ -0,0 +1,169 @@
+import sys
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from load_surfer import MAPPING_FILE_PATH, find_wave_file, load_index, match_tests
+from helpers.cycle_models import MODELS, simulate
+from helpers.parse_waveform import (
+    Signal,
+    check_wave_format,
+    list_signals,
+    sample_vcd,
+    select_signals,
+)
+
+
+def find_wave_files(pattern: str, entity: str | None) -> list[tuple[Path, str]]:
+    """Returns (wave file, entity) pairs: the wave file with the given entity if `pattern` is a
+    path, the wave files of the VUnit tests matching the glob pattern otherwise, with the
+    entity derived from the testbench name (`lib.<entity>_tb.<test>`) unless given."""
+
+    if Path(pattern).is_file():
+        if entity is None:
+            print("The entity of a wave file must be given via --entity.")
+            return []
+        return [(Path(pattern), entity)]
+    if not Path(MAPPING_FILE_PATH).exists():
+        print(f"{MAPPING_FILE_PATH} not found, run the VUnit tests first.")
+        return []
+
+    index = load_index()
+    wave_files = []
+    for test_name in match_tests(sorted(index["tests"]), pattern):
+        test = index["tests"][test_name]
+        wave_file = test["wave_file"] or find_wave_file(test["folder"])
+        if wave_file:
+            test_entity = entity or test_name.split(".")[1].removesuffix("_tb")
+            wave_files.append((Path(wave_file), test_entity))
+        else:
+            print(f"No wave file found for test {test_name}")
+    return wave_files
+
+
+def find_port(signals: list[Signal], instance: str, port: str) -> Signal | None:
+    """Returns the signal of the port of the instance, the outermost one if the pattern
+    matches several."""
+
+    matches = select_signals(signals, [f"*.{instance}.{port}"])
+    return min(matches, key=lambda signal: signal.name.count("."), default=None)
+
+
+def check_wave_file(
+    wave_file: Path, entity: str, instance: str, generics: dict[str, str], context: int
+) -> bool:
+    """Samples the ports of the instance at each rising edge of its clock, runs the cycle
+    model of the entity (see `helpers.cycle_models`) on the sampled inputs and compares its
+    outputs with the sampled outputs of the instance. Reports the first divergence."""
+
+    model = MODELS[entity]
+    signals = list_signals(wave_file)
+    ports = {
+        port: find_port(signals, instance, port)
+        for port in [model.clock] + model.inputs + model.outputs
+    }
+    # A missing output would silently go unchecked, so every port must be in the dump
+    missing = [port for port, signal in ports.items() if signal is None]
+    if missing:
+        print(
+            f"❌ {wave_file}: ports {', '.join(missing)} of {instance} are not in the dump "
+            "(run the tests with --all-signals)"
+        )
+        return False
+
+    sampled_ports = [signal for port, signal in ports.items() if port != model.clock]
+    edge_times, samples = sample_vcd(wave_file, ports[model.clock], sampled_ports)
+    cycles = len(edge_times)
+    inputs = {port: samples[ports[port].name] for port in model.inputs}
+    expected = simulate(entity, inputs, cycles, generics)
+
+    # The outputs after edge `n` are sampled right before edge `n + 1`
+    first_divergence = None
+    for port in model.outputs:
+        actual = samples[ports[port].name][1:]
+        mismatches = np.flatnonzero(actual != expected[port][:-1])
+        if len(mismatches) and (first_divergence is None or mismatches[0] < first_divergence[0]):
+            first_divergence = (int(mismatches[0]), port)
+
+    if first_divergence is None:
+        print(f"✅ {wave_file}: {entity} matches the model for {cycles} cycles")
+        return True
+
+    cycle, port = first_divergence
+    actual = samples[ports[port].name][cycle + 1]
+    print(
+        f"❌ {wave_file}: {port} diverges after clock edge {cycle} (#{edge_times[cycle]}), "
+        f"expected {expected[port][cycle]}, got {actual if actual >= 0 else 'unknown'}"
+    )
+    names = model.inputs + model.outputs
+    print(f"  {'edge':>8}  {'time':>12}  " + "  ".join(f"{name:>12}" for name in names))
+    for n in range(max(cycle - context, 0), cycle + 1):
+        values = [str(inputs[port][n]) for port in model.inputs]
+        for output in model.outputs:
+            sampled = samples[ports[output].name][n + 1]
+            expected_value = expected[output][n]
+            values.append(
+                str(sampled) if sampled == expected_value else f"{sampled}≠{expected_value}"
+            )
+        print(f"  {n:>8}  {'#' + str(edge_times[n]):>12}  " + "  ".join(f"{v:>12}" for v in values))
+    return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the outputs of an entity in VUnit wave files with its cycle model."
+    )
+    parser.add_argument(
+        "pattern",
+        type=str,
+        help="Wave file, or glob pattern of the tests whose wave files to check.",
+    )
+    parser.add_argument(
+        "--entity",
+        choices=sorted(MODELS),
+        default=None,
+        help="Entity to check, by default derived from the testbench name.",
+    )
+    parser.add_argument(
+        "--instance",
+        type=str,
+        default="inst_uut",
+        help="Label of the checked instance within the testbench (default: inst_uut).",
+    )
+    parser.add_argument(
+        "-g",
+        "--generic",
+        type=str,
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Generic of the checked instance (repeatable), the VHDL default otherwise.",
+    )
+    parser.add_argument(
+        "--context",
+        type=int,
+        default=5,
+        help="Number of cycles printed before the first divergence.",
+    )
+    args = parser.parse_args()
+    generics = dict(generic.split("=", 1) for generic in args.generic)
+
+    wave_files = find_wave_files(args.pattern, args.entity)
+    if not wave_files:
+        print("No wave files found.")
+        sys.exit(1)
+
+    passed = True
+    for wave_file, entity in wave_files:
+        if entity not in MODELS:
+            print(f"No cycle model of {entity}, use --entity with one of: {', '.join(MODELS)}")
+            passed = False
+            continue
+        try:
+            check_wave_format(wave_file)
+            passed &= check_wave_file(wave_file, entity, args.instance, generics, args.context)
+        except ValueError as error:
+            print(f"{wave_file}: {error}")
+            passed = False
+    sys.exit(0 if passed else 1)
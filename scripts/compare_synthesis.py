@@ -0,0 +1,104 @@
+import sys
+import argparse
+import subprocess
+
+from helpers.synthesis_metrics import (
+    SYNTHESIS_HISTORY_PATH,
+    compare_metrics,
+    load_history,
+)
+
+
+def list_commits(history: list[dict]) -> list[str]:
+    """Returns the commits found in the history, in order of their first appearance."""
+
+    return list(dict.fromkeys(record["commit"] for record in history))
+
+
+def resolve_commit(revision: str, commits: list[str]) -> str:
+    """Returns the recorded commit of a git revision (e.g. `HEAD~1`, `main` or a hash of any
+    length). Recorded commits are short hashes, optionally with a `-dirty` suffix, so they are
+    matched by prefix of the full hash, preferring the clean one. Revisions git does not know
+    (e.g. `unknown`) are returned unchanged."""
+
+    if revision in commits:
+        return revision
+    try:
+        full_hash = subprocess.run(
+            ["git", "rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return revision
+    matches = [
+        commit for commit in commits if full_hash.startswith(commit.removesuffix("-dirty"))
+    ]
+    return min(matches, key=lambda commit: commit.endswith("-dirty"), default=full_hash[:7])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare synthesis metrics of two commits recorded by synthesize.py."
+    )
+    parser.add_argument(
+        "base",
+        type=str,
+        nargs="?",
+        help="Commit to compare against (default: the second most recently recorded commit).",
+    )
+    parser.add_argument(
+        "head",
+        type=str,
+        nargs="?",
+        help="Commit to compare (default: the most recently recorded commit).",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=5.0,
+        help="Growth of a metric in percent above which it is reported as a regression.",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Print all compared metrics, not only the changed ones.",
+    )
+    args = parser.parse_args()
+
+    history = load_history()
+    commits = list_commits(history)
+    if len(commits) < 2 and not (args.base and args.head):
+        print(f"At least two commits need to be recorded in {SYNTHESIS_HISTORY_PATH}.")
+        sys.exit(1)
+
+    head = resolve_commit(args.head, commits) if args.head else commits[-1]
+    base = (
+        resolve_commit(args.base, commits)
+        if args.base
+        else [commit for commit in commits if commit != head][-1]
+    )
+    rows = compare_metrics(history, base, head, args.threshold)
+    if not rows:
+        print(f"No designs synthesized in both {base} and {head}.")
+        sys.exit(1)
+
+    print(f"Comparing {head} against {base} (threshold {args.threshold} %):\n")
+    for row in rows:
+        if not args.all and row["base"] == row["head"]:
+            continue
+        icon = "❌" if row["regression"] else "✅"
+        generics = f" ({row['generics']})" if row["generics"] else ""
+        print(
+            f"{icon} {row['entity']}{generics} [{row['synthesis_command']}] {row['metric']}: "
+            f"{row['base']} -> {row['head']} ({row['change']:+.1f} %)"
+        )
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} metric(s) grew by more than {args.threshold} %.")
+        sys.exit(1)
+    else:
+        print("\n✅ No area regressions found.")
+        sys.exit(0)
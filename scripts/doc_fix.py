@@ -1,31 +1,198 @@
+import json
+import argparse
+import hashlib
 from pathlib import Path
 
-from helpers.rename_wavedrom_svgs import cleanup_and_rename_svgs
-from helpers.document_asserts import document_all_asserts
-from helpers.document_assumptions import document_all_assumptions
-from helpers.document_covers import document_all_covers
+from helpers.extract_properties import extract_properties
+from helpers.rename_wavedrom_svgs import (
+    add_white_backgrounds,
+    apply_rename_map,
+    rename_entity_svgs,
+    update_markdown_references,
+)
+from helpers.document_properties import (
+    generate_asserts_section,
+    generate_assumptions_section,
+    generate_covers_section,
+)
 
+SOURCE_DIRECTORY = Path("source")
+MANIFEST_PATH = Path("simulation/doc_fix_manifest.json")
 
-def rename_entity_documents(directory: Path) -> None:
-    """Rename entity Markdown files to 'README.md' to make them show up in GitHub."""
+# Generated sections are always placed at the end of README.md in this order
+SECTION_GENERATORS = [
+    generate_covers_section,
+    generate_assumptions_section,
+    generate_asserts_section,
+]
+SECTION_HEADINGS = ["## Covers", "## Assumptions", "## Assertions"]
 
+
+def is_netlist_folder(folder: Path) -> bool:
+    """Folders of per-module netlist SVGs written by `synthesize.py --hierarchical` next to the
+    entity (`<entity>/<entity>_netlist/`) are not entity folders."""
+
+    return folder.name == f"{folder.parent.name}_netlist"
+
+
+def rename_entity_document(entity_folder: Path) -> None:
+    """Rename entity Markdown file to 'README.md' to make it show up in GitHub."""
+
+    entity_vhdl_file = entity_folder / f"{entity_folder.name}.vhd"
+    entity_markdown_file = entity_folder / f"{entity_folder.name}.md"
+
+    if entity_vhdl_file.exists() and entity_markdown_file.exists():
+        if (entity_folder / "README.md").exists():
+            (entity_folder / "README.md").unlink()
+        entity_markdown_file.rename(entity_folder / "README.md")
+        print(f"Doc renamed: {entity_markdown_file} -> {entity_folder / 'README.md'}")
+
+
+def replace_generated_sections(readme: str, sections: list[str]) -> str:
+    """Removes all generated sections (and everything after them) from the README content
+    and appends the new non-empty sections."""
+
+    lines = readme.splitlines(keepends=True)
+
+    # Remove all lines beginning with the first line which contains a generated section heading
+    for index, line in enumerate(lines):
+        if any(heading in line for heading in SECTION_HEADINGS):
+            lines = lines[:index]
+            break
+
+    # Remove all blank lines at the end of the list
+    while lines and not lines[-1].strip():
+        lines.pop()
+
+    content = "".join(lines)
+    for section in sections:
+        if section:
+            content += "\n" + section
+    return content
+
+
+def fingerprint_entity(entity_folder: Path) -> str:
+    """Hashes names, sizes and modification times of all files within the entity folder."""
+
+    sha = hashlib.sha256()
+    for path in sorted(entity_folder.iterdir()):
+        if path.is_file():
+            stat = path.stat()
+            sha.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return sha.hexdigest()
+
+
+def fingerprint_scripts() -> str:
+    """Hashes the documentation scripts, so that changing them invalidates the manifest."""
+
+    sha = hashlib.sha256()
+    scripts_directory = Path(__file__).parent
+    for path in [Path(__file__)] + sorted((scripts_directory / "helpers").glob("*.py")):
+        sha.update(path.read_bytes())
+    return sha.hexdigest()
+
+
+def load_manifest() -> dict[str, str]:
+    if not MANIFEST_PATH.exists():
+        return {}
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        print(f"WARNING: {MANIFEST_PATH} could not be read, ignoring it...")
+        return {}
+
+
+def save_manifest(manifest: dict[str, str]) -> None:
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+
+
+def document_entity(entity_folder: Path) -> None:
+    """Runs all documentation steps for a single entity folder. The VHDL and PSL files are parsed
+    once and README.md is written at most once, and only if its content changed."""
+
+    rename_entity_document(entity_folder)
+
+    readme_path = entity_folder / "README.md"
+    other_markdown_files = [f for f in entity_folder.glob("*.md") if f != readme_path]
+    markdown_files = [readme_path] if readme_path.exists() else []
+    rename_map = rename_entity_svgs(entity_folder, markdown_files + other_markdown_files)
+    update_markdown_references(other_markdown_files, rename_map)
+    add_white_backgrounds(entity_folder)
+
+    vhdl_path = entity_folder / f"{entity_folder.name}.vhd"
+    if not vhdl_path.exists():
+        print(f"WARNING: {vhdl_path} does not exist. Skipping it...")
+        return
+    if not readme_path.exists():
+        print(f"WARNING: {readme_path} does not exist. Skipping it...")
+        return
+
+    properties = extract_properties(vhdl_path)
+    psl_path = entity_folder / f"{entity_folder.name}.psl"
+    if psl_path.exists():
+        properties += extract_properties(psl_path)
+
+    original_readme = readme_path.read_text(encoding="utf-8")
+    readme, renamed_refs = apply_rename_map(original_readme, rename_map)
+    sections = [generate(properties) for generate in SECTION_GENERATORS]
+    readme = replace_generated_sections(readme, sections)
+
+    if renamed_refs > 0:
+        print(
+            f"Updated {renamed_refs} SVG reference{'s' if renamed_refs > 1 else ''}: {readme_path}"
+        )
+    if readme != original_readme:
+        readme_path.write_text(readme, encoding="utf-8")
+        print(f"Doc updated: {readme_path}")
+
+
+def document_all_entities(directory: Path, force: bool = False) -> None:
+    """Walks the directory once and documents every entity folder whose files (or the documentation
+    scripts themselves) changed since the last run, as recorded in the manifest."""
+
+    manifest = {} if force else load_manifest()
+    scripts_fingerprint = fingerprint_scripts()
+    if manifest.get("scripts") != scripts_fingerprint:
+        manifest = {}
+
+    new_manifest = {"scripts": scripts_fingerprint}
+    skipped = 0
     for entity_folder in directory.rglob("*"):
-        if entity_folder.is_dir():
-            entity_vhdl_file = entity_folder / f"{entity_folder.name}.vhd"
-            entity_markdown_file = entity_folder / f"{entity_folder.name}.md"
+        if not entity_folder.is_dir() or is_netlist_folder(entity_folder):
+            continue
 
-            if entity_vhdl_file.exists() and entity_markdown_file.exists():
-                if (entity_folder / "README.md").exists():
-                    (entity_folder / "README.md").unlink()
-                entity_markdown_file.rename(entity_folder / "README.md")
-                print(
-                    f"Doc renamed: {entity_markdown_file} -> {entity_folder / 'README.md'}"
-                )
+        key = entity_folder.as_posix()
+        fingerprint = fingerprint_entity(entity_folder)
+        if manifest.get(key) == fingerprint:
+            new_manifest[key] = fingerprint
+            skipped += 1
+            continue
+
+        if not list(entity_folder.glob("*.vhd")):
+            print(f"WARNING: No .vhd files found in {entity_folder}. Skipping...")
+        else:
+            document_entity(entity_folder)
+
+        # Fingerprint is taken after documenting, so that our own changes do not trigger a rerun
+        new_manifest[key] = fingerprint_entity(entity_folder)
+
+    save_manifest(new_manifest)
+    if skipped:
+        print(f"Skipped {skipped} unchanged folder{'s' if skipped > 1 else ''}.")
 
 
 if __name__ == "__main__":
-    rename_entity_documents(Path("source"))
-    cleanup_and_rename_svgs(Path("source"))
-    document_all_covers(Path("source"))
-    document_all_assumptions(Path("source"))
-    document_all_asserts(Path("source"))
+    parser = argparse.ArgumentParser(
+        description="Improve documentation of VHDL entities within source directory."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Document all entities, even those which did not change since the last run.",
+    )
+    args = parser.parse_args()
+
+    document_all_entities(SOURCE_DIRECTORY, args.force)
@@ -0,0 +1,219 @@
+import re
+import sys
+import argparse
+from itertools import product
+from pathlib import Path
+
+from run_sby import SBY_OUTPUT_DIRECTORY, list_sby_jobs, run_sby_jobs
+from helpers.parse_sby import read_sby_sections
+from helpers.parse_vhdl import get_dependency_closure, get_entity_generics, load_design_units
+
+SOURCE_DIRECTORY = Path("source")
+TESTBENCH_DIRECTORY = Path("testbench")
+GENERATED_SBY_DIRECTORY = SBY_OUTPUT_DIRECTORY / "generated"
+
+GENERIC_PATTERN = re.compile(r"-g(?P<name>\w+)=(?P<value>\S+)")
+
+# Used for entities without a hand-written .sby file next to their testbench
+DEFAULT_SECTIONS = {
+    "tasks": ["bmc", "prove", "cover"],
+    "options": [
+        f"{mode}: {line}"
+        for mode in ["bmc", "prove", "cover"]
+        for line in [f"mode {mode}", "depth 30", "append 1"]
+    ],
+    "engines": ["smtbmc z3"],
+    "script": [
+        "ghdl -fpsl --std=08 -e {entity}",
+        "prep -top {entity}",
+        "chformal -assert -remove */*_note",
+        "chformal -assert -remove */*_warning",
+    ],
+}
+
+
+def parse_generic_values(text: str) -> tuple[str, list[str]]:
+    """Parses `NAME=V1,V2,...` into `(NAME, [V1, V2, ...])`."""
+
+    name, separator, values = text.partition("=")
+    if not separator or not name or not values:
+        raise argparse.ArgumentTypeError(f"Invalid generic: {text}, expected NAME=V1,V2,...")
+    return name, values.split(",")
+
+
+def get_template_sections(entity: str) -> dict[str, list[str]]:
+    """Returns the sections of the hand-written `testbench/<entity>/<entity>.sby` file, or the
+    default ones (see `DEFAULT_SECTIONS`) if there is none."""
+
+    sby_file = TESTBENCH_DIRECTORY / entity / f"{entity}.sby"
+    if not sby_file.exists():
+        return {
+            name: [line.format(entity=entity) for line in lines]
+            for name, lines in DEFAULT_SECTIONS.items()
+        }
+    return read_sby_sections(sby_file)
+
+
+def get_ghdl_line(script_lines: list[str]) -> tuple[int, str]:
+    for index, line in enumerate(script_lines):
+        if line.split(":")[-1].split()[:1] == ["ghdl"]:
+            return index, line
+    raise ValueError("The [script] section has no ghdl command")
+
+
+def get_formal_files(entity: str, source_directory: Path = SOURCE_DIRECTORY) -> list[Path]:
+    """Returns the VHDL files the entity depends on (transitively, through `entity work.*`
+    instantiations and `use work.*` clauses) in analysis order, followed by the PSL files
+    next to the entity."""
+
+    units = load_design_units(sorted(source_directory.glob("**/*.vhd")))
+    vhd_files = get_dependency_closure(units, {entity.lower()})
+    entity_files = [path for path in vhd_files if entity.lower() in units[path][0]]
+    if not entity_files:
+        raise ValueError(f"Entity {entity} not found in {source_directory}")
+    return vhd_files + sorted(entity_files[0].parent.glob("*.psl"))
+
+
+def check_generics(entity: str, names: list[str], files: list[Path]) -> None:
+    """Raises `ValueError` if any of the generic names is not a generic of the entity, which
+    would otherwise only fail once ghdl elaborates the tasks."""
+
+    declared = set()
+    for path in files:
+        if path.suffix == ".vhd":
+            declared |= get_entity_generics(path.read_text(encoding="utf-8"), entity) or set()
+    unknown = [name for name in names if name.lower() not in declared]
+    if unknown:
+        raise ValueError(
+            f"Unknown generics of {entity}: {', '.join(unknown)} "
+            f"(declared: {', '.join(sorted(declared)) or 'none'})"
+        )
+
+
+def get_point_name(point: dict[str, str]) -> str:
+    if not point:
+        return "default"
+    return "_".join(name.lower() + re.sub(r"\W+", "", value) for name, value in point.items())
+
+
+def generate_sby(
+    entity: str,
+    sweep: dict[str, list[str]],
+    directory: Path = GENERATED_SBY_DIRECTORY,
+) -> Path:
+    """Writes `directory / <entity>.sby` with a task for each mode of the template .sby file
+    (see `get_template_sections`) and each point of the cross product of the generic values.
+    Generics which are not swept keep their value from the template.
+
+    The tasks are named `<mode>_<point>` and tagged with both the mode and the point, so the
+    template lines prefixed by a mode apply to all of its points, and each point gets its own
+    `ghdl -g...` line. The `[files]` section is derived from the dependencies of the entity and
+    uses absolute paths. Raises `ValueError` for swept generics the entity does not declare."""
+
+    files = get_formal_files(entity)
+    check_generics(entity, list(sweep), files)
+    sections = get_template_sections(entity)
+    ghdl_index, ghdl_line = get_ghdl_line(sections["script"])
+    ghdl_arguments = ghdl_line.split(":")[-1].split()[1:]
+
+    generics = {
+        match.group("name"): [match.group("value")]
+        for match in map(GENERIC_PATTERN.fullmatch, ghdl_arguments)
+        if match
+    }
+    generics.update(sweep)
+    flags = [
+        argument
+        for argument in ghdl_arguments[: ghdl_arguments.index("-e")]
+        if argument.startswith("-") and not GENERIC_PATTERN.fullmatch(argument)
+    ]
+
+    file_names = [path.name for path in files]
+    modes = [task for line in sections["tasks"] for task in line.split(":")[0].split()]
+    points = [dict(zip(generics, values)) for values in product(*generics.values())]
+
+    task_lines, ghdl_lines = [], []
+    for point in points:
+        point_name = get_point_name(point)
+        for mode in modes:
+            task_lines.append(f"{mode}_{point_name}: {mode} {point_name}")
+        arguments = [f"-g{name}={value}" for name, value in point.items()]
+        ghdl_lines.append(
+            f"{point_name}: ghdl {' '.join(arguments + flags + file_names)} -e {entity}"
+        )
+
+    script_lines = sections["script"]
+    content = [
+        f"# Generated by generate_sby.py from the sources of {entity}, do not edit",
+        "[tasks]",
+        *task_lines,
+        "",
+        "[options]",
+        *sections.get("options", []),
+        "",
+        "[engines]",
+        *sections.get("engines", []),
+        "",
+        "[script]",
+        *script_lines[:ghdl_index],
+        *ghdl_lines,
+        *script_lines[ghdl_index + 1 :],
+        "",
+        "[files]",
+        *(path.resolve().as_posix() for path in files),
+    ]
+
+    sby_file = directory / f"{entity}.sby"
+    sby_file.parent.mkdir(parents=True, exist_ok=True)
+    sby_file.write_text("\n".join(content) + "\n", encoding="utf-8")
+    return sby_file
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate a .sby file sweeping the generics of an entity."
+    )
+    parser.add_argument("entity", type=str, help="Name of the entity (e.g. debouncer).")
+    parser.add_argument(
+        "-g",
+        "--generic",
+        type=parse_generic_values,
+        action="append",
+        default=[],
+        help="Generic values to sweep (e.g. -g PERIOD=3,5,8), repeatable for the cross product.",
+    )
+    parser.add_argument(
+        "--run", action="store_true", help="Run all tasks of the generated .sby file."
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of tasks to run in parallel with --run.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Timeout in seconds for a single task, after which the task is killed and fails.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run all tasks, even those whose inputs did not change since their last run.",
+    )
+    args = parser.parse_args()
+
+    try:
+        sby_file = generate_sby(args.entity, dict(args.generic))
+    except ValueError as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+    print(f"Generated {sby_file}")
+
+    if args.run:
+        jobs = list_sby_jobs([sby_file])
+        print(f"Running {len(jobs)} tasks with {args.jobs} job(s)...\n")
+        results = run_sby_jobs(jobs, args.jobs, args.timeout, use_cache=not args.force)
+        sys.exit(0 if all(results.values()) else 1)
@@ -1,33 +1,275 @@
+import os
 import re
+import json
+import hashlib
 from pathlib import Path
+from typing import Iterator
 
 SOURCE_DIRECTORY = Path("source")
 FILE_NAME_PATTERN = re.compile(r"wavedrom_[A-Za-z0-9]{5}\.svg")
+SVG_CACHE_PATH = Path("simulation/svg_cache.json")
 
+BACKGROUND = '<rect width="100%" height="100%" fill="white"/>'
+NETLISTSVG_NAMESPACE = "https://github.com/nturley/netlistsvg"
+CHUNK_SIZE = 1 << 16
 
-def add_white_background(svg_file: Path):
-    with open(svg_file, "r", encoding="utf-8") as f:
-        content = f.read()
+TAG_PATTERN = re.compile(r"<(?:[^>\"']|\"[^\"]*\"|'[^']*')*>")
+TAG_NAME_PATTERN = re.compile(r"</?([^\s/>]+)")
+ATTRIBUTE_PATTERN = re.compile(r"\s+([^\s=]+)\s*=\s*(\"[^\"]*\"|'[^']*')")
+NUMBER_PATTERN = re.compile(r"-?\d*\.\d+(?:[eE][-+]?\d+)?")
+CSS_SPACE_PATTERN = re.compile(r"\s*([{};:,>])\s*")
 
-    # Skip if the SVG already has a white background
-    if '<rect width="100%" height="100%" fill="white"/>' in content:
-        return
+# Attributes whose numbers are rounded when minifying
+GEOMETRY_ATTRIBUTES = frozenset(
+    "x y x1 x2 y1 y2 cx cy r rx ry dx dy width height d points transform viewBox".split()
+)
+# Elements whose whitespace is significant
+TEXT_ELEMENTS = frozenset(["text", "tspan", "textPath", "title", "desc"])
+# Elements which are dropped when repeated with the same content (e.g. netlistsvg skin styles)
+DEDUPLICATED_ELEMENTS = frozenset(["defs", "style"])
 
-    # Regex to find the <svg> tag and insert the <rect>
-    modified_content = re.sub(
-        r"(<svg[^>]*>)", r'\1<rect width="100%" height="100%" fill="white"/>', content
-    )
 
-    with open(svg_file, "w", encoding="utf-8") as f:
-        f.write(modified_content)
+def iter_svg_tokens(file) -> Iterator[str]:
+    """Yields the content of the file split into tags (including comments, `<![CDATA[...]]>`
+    and declarations) and the text between them. The file is read in chunks, so only the
+    current token needs to fit into memory."""
+
+    buffer = ""
+    at_end = False
+    while not at_end:
+        chunk = file.read(CHUNK_SIZE)
+        at_end = not chunk
+        buffer += chunk
+        position = 0
+        while True:
+            start = buffer.find("<", position)
+            if start < 0:
+                break
+            if start > position:
+                yield buffer[position:start]
+                position = start
+
+            if buffer.startswith("<!--", start):
+                end = buffer.find("-->", start)
+                end = end + 3 if end >= 0 else -1
+            elif buffer.startswith("<![CDATA[", start):
+                end = buffer.find("]]>", start)
+                end = end + 3 if end >= 0 else -1
+            else:
+                match = TAG_PATTERN.match(buffer, start)
+                end = match.end() if match else -1
+            if end < 0:
+                break
+            yield buffer[start:end]
+            position = end
+
+        buffer = buffer[position:]
+        if at_end and buffer:
+            yield buffer
+
+
+def get_tag_name(tag: str) -> str:
+    match = TAG_NAME_PATTERN.match(tag)
+    return match.group(1) if match else ""
+
+
+def is_start_tag(tag: str) -> bool:
+    return tag.startswith("<") and tag[1:2] not in "/!?" and not tag.endswith("/>")
+
+
+def format_number(match: re.Match, precision: int) -> str:
+    text = f"{round(float(match.group()), precision):.{precision}f}".rstrip("0").rstrip(".")
+    return "0" if text in ("-0", "") else text
+
+
+def minify_tag(tag: str, precision: int, namespace_prefix: str | None) -> str:
+    """Rounds the numbers in geometry attributes and removes the attributes of the netlistsvg
+    namespace (layout metadata which is not used for rendering)."""
+
+    name = get_tag_name(tag)
+    if tag.startswith("</"):
+        return f"</{name}>"
+    attributes = []
+    for match in ATTRIBUTE_PATTERN.finditer(tag):
+        attribute, value = match.groups()
+        if namespace_prefix and (
+            attribute.startswith(f"{namespace_prefix}:") or attribute == f"xmlns:{namespace_prefix}"
+        ):
+            continue
+        if attribute in GEOMETRY_ATTRIBUTES:
+            value = NUMBER_PATTERN.sub(lambda number: format_number(number, precision), value)
+        attributes.append(f" {attribute}={value}")
+    return f"<{name}{''.join(attributes)}{'/>' if tag.endswith('/>') else '>'}"
+
+
+def transform_svg(
+    tokens: Iterator[str], minify: bool = False, precision: int = 2
+) -> Iterator[str]:
+    """Inserts a white background right after the opening tag of the root `<svg>` element
+    (unless it is already there) and optionally minifies the SVG: comments, `<metadata>`
+    and netlistsvg layout metadata are removed, numbers in geometry attributes are rounded
+    to `precision` decimals, whitespace between tags and within styles is collapsed and
+    repeated `<defs>`/`<style>` elements with the same content are dropped."""
+
+    root_seen = False
+    check_background = False
+    namespace_prefix = None
+    text_depth = 0
+    skip_depth = 0
+    group: list[str] | None = None
+    group_name = ""
+    group_depth = 0
+    seen_groups: set[str] = set()
+
+    for token in tokens:
+        is_tag = token.startswith("<")
+
+        if check_background and (is_tag or token.strip()):
+            check_background = False
+            if token != BACKGROUND:
+                yield BACKGROUND
+
+        if not minify:
+            if is_tag and not root_seen and get_tag_name(token) == "svg" and is_start_tag(token):
+                root_seen = check_background = True
+            yield token
+            continue
+
+        if not is_tag:
+            if skip_depth:
+                continue
+            if text_depth:
+                output = token
+            elif group is not None and group_name == "style":
+                output = CSS_SPACE_PATTERN.sub(r"\1", re.sub(r"\s+", " ", token)).strip()
+            elif token.strip():
+                output = token.strip()
+            else:
+                continue
+        else:
+            if token.startswith("<!--"):
+                continue
+            name = get_tag_name(token)
+            closing = token.startswith("</")
 
-    print(f"Added white background: {svg_file}")
+            if not root_seen and name == "svg" and is_start_tag(token):
+                root_seen = check_background = True
+                match = re.search(rf"xmlns:(\w+)=\"{re.escape(NETLISTSVG_NAMESPACE)}\"", token)
+                namespace_prefix = match.group(1) if match else None
+
+            # Metadata elements are skipped along with all of their content
+            if skip_depth or name == "metadata" or (
+                namespace_prefix and name.startswith(f"{namespace_prefix}:")
+            ):
+                if is_start_tag(token):
+                    skip_depth += 1
+                elif closing:
+                    skip_depth -= 1
+                continue
+
+            output = token if token.startswith("<!") or token.startswith("<?") else minify_tag(
+                token, precision, namespace_prefix
+            )
+            if output == "<g/>":
+                continue
+            if name in TEXT_ELEMENTS:
+                text_depth += 1 if is_start_tag(token) else -1 if closing else 0
+
+            if group is None and name in DEDUPLICATED_ELEMENTS and is_start_tag(token):
+                group, group_name, group_depth = [], name, 0
+            if group is not None and name == group_name:
+                group_depth += 1 if is_start_tag(token) else -1 if closing else 0
+
+        if group is None:
+            yield output
+            continue
+        group.append(output)
+        if group_depth == 0:
+            content = "".join(group)
+            if content not in seen_groups:
+                seen_groups.add(content)
+                yield content
+            group = None
+
+    if group is not None:
+        yield "".join(group)
+
+
+def load_svg_cache(cache_path: Path = SVG_CACHE_PATH) -> dict[str, dict]:
+    if not cache_path.exists():
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_svg_cache(cache: dict[str, dict], cache_path: Path = SVG_CACHE_PATH) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as file:
+        json.dump(cache, file, indent=2, sort_keys=True)
+
+
+def add_white_background(
+    svg_file: Path, minify: bool = False, precision: int = 2, cache: dict | None = None
+) -> bool:
+    """Streams the SVG file through `transform_svg` into a temporary file, which replaces the
+    original only if the content changed. Returns whether the file changed.
+
+    If a cache (see `load_svg_cache`) is given, files whose modification time and size did
+    not change since they were last processed with the same options are skipped without
+    being read."""
+
+    options = f"minify={minify},precision={precision}"
+    key = Path(svg_file).as_posix()
+    stat = svg_file.stat()
+    entry = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "options": options}
+    if cache is not None and cache.get(key) == entry:
+        return False
+
+    input_hash, output_hash = hashlib.sha256(), hashlib.sha256()
+    temporary_file = svg_file.with_name(f"{svg_file.name}.{os.getpid()}.tmp")
+
+    def read_tokens(file) -> Iterator[str]:
+        for token in iter_svg_tokens(file):
+            input_hash.update(token.encode())
+            yield token
+
+    with open(svg_file, "r", encoding="utf-8") as source, open(
+        temporary_file, "w", encoding="utf-8", newline=""
+    ) as target:
+        for token in transform_svg(read_tokens(source), minify, precision):
+            output_hash.update(token.encode())
+            target.write(token)
+
+    changed = input_hash.digest() != output_hash.digest()
+    if changed:
+        os.replace(temporary_file, svg_file)
+        print(f"{'Minified' if minify else 'Added white background'}: {svg_file}")
+    else:
+        temporary_file.unlink()
+
+    if cache is not None:
+        stat = svg_file.stat()
+        cache[key] = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "options": options}
+    return changed
 
 
 if __name__ == "__main__":
-    for entity_folder in SOURCE_DIRECTORY.rglob("*"):
-        if entity_folder.is_dir():
-            svg_files: list[Path] = entity_folder.glob("*.svg")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Add white backgrounds to the SVGs in source/.")
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="Also minify the netlist SVGs (`*_netlist.svg`).",
+    )
+    args = parser.parse_args()
 
-            for svg_file in svg_files:
-                add_white_background(svg_file)
+    svg_cache = load_svg_cache()
+    for svg_file in sorted(SOURCE_DIRECTORY.glob("**/*.svg")):
+        add_white_background(
+            svg_file, minify=args.minify and svg_file.stem.endswith("_netlist"), cache=svg_cache
+        )
+    save_svg_cache(svg_cache)
@@ -0,0 +1,125 @@
+import os
+import hashlib
+import threading
+from pathlib import Path
+
+import numpy as np
+
+VECTOR_DIRECTORY = Path("simulation/vectors")
+HEX_CHARACTERS = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+# Part of the vector file names, so files written by an older version of the model are not reused
+MODEL_HASH = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:8]
+
+
+def get_decimal_size(number: int) -> int:
+    """Returns the number of digits required for decimal representation of number, like
+    `get_decimal_size` of `bcd_conversion_package`."""
+
+    return len(str(number))
+
+
+def get_bcd_digits(binary_width: int) -> int:
+    return get_decimal_size(2**binary_width - 1)
+
+
+def unsigned_to_bcd(binary: np.ndarray, binary_width: int) -> np.ndarray:
+    """Returns the BCD digits of each number as an array of shape `(len(binary), digits)`,
+    least significant digit first (i.e. column `d` is element `d` of the `t_bcd_array`
+    returned by `unsigned_to_bcd` of `bcd_conversion_package` for the given width)."""
+
+    remainder = np.asarray(binary, dtype=np.uint64)
+    digits = np.empty((remainder.size, get_bcd_digits(binary_width)), dtype=np.uint8)
+    for d in range(digits.shape[1]):
+        remainder, digits[:, d] = np.divmod(remainder, 10)
+    return digits
+
+
+def bcd_to_natural(digits: np.ndarray) -> np.ndarray:
+    """Inverse of `unsigned_to_bcd`, like `bcd_to_natural` of `bcd_conversion_package`."""
+
+    weights = 10 ** np.arange(digits.shape[1], dtype=np.uint64)
+    return digits.astype(np.uint64) @ weights
+
+
+def generate_inputs(binary_width: int, count: int | None = None, seed: int = 0) -> np.ndarray:
+    """Returns every number of the given width in ascending order, or `count` random numbers
+    if that is less than all of them. The sample always contains both extremes."""
+
+    total = 2**binary_width
+    if count is None or count >= total:
+        return np.arange(total, dtype=np.uint64)
+    sample = np.random.default_rng(seed).integers(0, total, size=count, dtype=np.uint64)
+    sample[:2] = [0, total - 1]
+    return sample
+
+
+def to_hex_columns(values: np.ndarray, hex_digits: int) -> np.ndarray:
+    """Returns the ASCII hex digits of the numbers, most significant first, as an array of
+    shape `(len(values), hex_digits)`."""
+
+    shifts = np.arange(hex_digits - 1, -1, -1, dtype=np.uint64) * np.uint64(4)
+    return HEX_CHARACTERS[(values[:, None] >> shifts) & np.uint64(0xF)]
+
+
+def write_vector_file(
+    path: Path, binary: np.ndarray, digits: np.ndarray, binary_width: int
+) -> Path:
+    """Writes one vector per line: the input as hex digits (padded to whole nibbles) and the
+    expected BCD digits, most significant first, which are also hex digits of the BCD vector
+    (e.g. `7B 0123`). Both are read by `hread` of VHDL-2008 textio. The file is written as a
+    whole from a NumPy byte array, so millions of vectors take well under a second, and is
+    renamed into place afterwards, so parallel runs never read a partially written file."""
+
+    binary_columns = to_hex_columns(np.asarray(binary, dtype=np.uint64), (binary_width + 3) // 4)
+    bcd_columns = digits[:, ::-1] + ord("0")
+    separator = np.full((len(binary_columns), 1), ord(" "), dtype=np.uint8)
+    newline = np.full((len(binary_columns), 1), ord("\n"), dtype=np.uint8)
+    lines = np.hstack([binary_columns, separator, bcd_columns.astype(np.uint8), newline])
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_suffix(f".{os.getpid()}_{threading.get_ident()}.tmp")
+    lines.tofile(temporary_path)
+    os.replace(temporary_path, path)
+    return path
+
+
+def get_vector_file_path(binary_width: int, count: int | None = None, seed: int = 0) -> Path:
+    name = f"bcd_w{binary_width}" + (f"_n{count}_s{seed}" if count is not None else "")
+    return VECTOR_DIRECTORY / f"{name}_{MODEL_HASH}.txt"
+
+
+def ensure_vector_file(binary_width: int, count: int | None = None, seed: int = 0) -> Path:
+    """Returns the vector file of the given width (see `generate_inputs`), generating it with
+    the expected outputs of the reference model first if it does not exist yet. The file name
+    contains the hash of this module, so changing the model generates new files."""
+
+    path = get_vector_file_path(binary_width, count, seed)
+    if not path.exists():
+        binary = generate_inputs(binary_width, count, seed)
+        digits = unsigned_to_bcd(binary, binary_width)
+        assert np.array_equal(bcd_to_natural(digits), binary)
+        write_vector_file(path, binary, digits, binary_width)
+    return path
+
+
+def add_vector_configs(
+    testbench, widths: list[int], count: int | None = None, seed: int = 0
+) -> None:
+    """Adds a configuration of the testbench (`vunit.ui.testbench.TestBench`) for each width,
+    which streams through the vector file of that width (exhaustive, or `count` random
+    inputs). The file is generated right before the first simulation which needs it. The
+    testbench is expected to have `BINARY_WIDTH` and `VECTOR_FILE` generics."""
+
+    for width in widths:
+        path = get_vector_file_path(width, count, seed)
+        name = f"binary_width={width}" + (f".count={count}" if count is not None else "")
+
+        def pre_config(width=width) -> bool:
+            ensure_vector_file(width, count, seed)
+            return True
+
+        testbench.add_config(
+            name=name,
+            generics={"BINARY_WIDTH": width, "VECTOR_FILE": path.resolve().as_posix()},
+            pre_config=pre_config,
+        )
@@ -0,0 +1,100 @@
+import os
+from itertools import combinations, product
+
+# Set (e.g. by `run_vunit.py --full-sweep` in nightly runs) to add the full cross product
+# of the generic values instead of a covering array
+FULL_SWEEP_VARIABLE = "VUNIT_FULL_SWEEP"
+
+
+def covering_array(parameters: dict[str, list], strength: int = 2) -> list[dict]:
+    """Returns a list of parameter assignments in which every combination of values of any
+    `strength` parameters appears at least once (pairwise for `strength=2`). The array is
+    built by the IPOG strategy: it starts with the cross product of the first `strength`
+    parameters and then adds the remaining ones one at a time, first choosing the value
+    of the new parameter for each existing row so that it covers the most combinations
+    still missing, then adding rows for the combinations not covered yet. The result is
+    deterministic and usually close to minimal, although not guaranteed to be minimal."""
+
+    names = list(parameters)
+    values = [list(parameters[name]) for name in names]
+    if any(len(v) == 0 for v in values):
+        return []
+    if len(names) <= strength:
+        return [dict(zip(names, row)) for row in product(*values)]
+
+    # Rows hold value indices, `None` marks a value which can still be chosen freely
+    rows: list[list[int | None]] = [
+        list(row) for row in product(*(range(len(v)) for v in values[:strength]))
+    ]
+    for i in range(strength, len(names)):
+        uncovered = {
+            (columns, combination)
+            for columns in combinations(range(i), strength - 1)
+            for combination in product(
+                *(range(len(values[j])) for j in columns), range(len(values[i]))
+            )
+        }
+
+        def covered_by(row: list, value: int) -> set:
+            covered = set()
+            for columns in combinations(range(i), strength - 1):
+                combination = tuple(row[j] for j in columns)
+                if None not in combination and (columns, combination + (value,)) in uncovered:
+                    covered.add((columns, combination + (value,)))
+            return covered
+
+        # Horizontal growth: extend the existing rows by the new parameter
+        for r, row in enumerate(rows):
+            # On ties, the values are rotated between the rows to spread them evenly
+            best = max(
+                range(len(values[i])),
+                key=lambda value: (len(covered_by(row, value)), -((value - r) % len(values[i]))),
+            )
+            uncovered -= covered_by(row, best)
+            row.append(best)
+
+        # Vertical growth: fill free values of the rows, or add new ones, for the rest
+        for columns, combination in sorted(uncovered):
+            for row in rows:
+                if row[i] == combination[-1] and all(
+                    row[j] in (None, value) for j, value in zip(columns, combination)
+                ):
+                    break
+            else:
+                row = [None] * i + [combination[-1]]
+                rows.append(row)
+            for j, value in zip(columns, combination):
+                row[j] = value
+
+    assignments = []
+    for row in rows:
+        assignment = {
+            name: values[j][0 if index is None else index]
+            for j, (name, index) in enumerate(zip(names, row))
+        }
+        if assignment not in assignments:
+            assignments.append(assignment)
+    return assignments
+
+
+def is_full_sweep() -> bool:
+    return os.environ.get(FULL_SWEEP_VARIABLE, "") not in ("", "0")
+
+
+def add_covering_configs(testbench, generics: dict[str, list], strength: int = 2) -> list[dict]:
+    """Adds a configuration of the testbench (`vunit.ui.testbench.TestBench`) for each row of
+    the covering array of the generic values (see `covering_array`), or for each point of
+    their cross product if the full sweep is enabled (`FULL_SWEEP_VARIABLE`). The
+    configurations are named `generic_a=value.generic_b=value`. Returns the added generics."""
+
+    if is_full_sweep():
+        assignments = [dict(zip(generics, row)) for row in product(*generics.values())]
+    else:
+        assignments = covering_array(generics, strength)
+
+    for assignment in assignments:
+        testbench.add_config(
+            name=".".join(f"{name.lower()}={value}" for name, value in assignment.items()),
+            generics=assignment,
+        )
+    return assignments
@@ -0,0 +1,165 @@
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+# The models take the number of clock cycles, an array of the input values sampled at each
+# rising clock edge per input port (0/1 for `std_logic`) and the generics of the entity
+# (lowercase). They return an array per output port holding its value right after each edge.
+# Registers start at their initial values from the VHDL code. The sequential logic is
+# expressed with cumulative sums and forward fills instead of a loop over the cycles, so
+# the models run at millions of cycles per second.
+
+
+@dataclass
+class CycleModel:
+    function: Callable[..., dict[str, np.ndarray]]
+    inputs: list[str]
+    outputs: list[str]
+    clock: str = "i_clk"
+
+
+def hold(values: np.ndarray, update: np.ndarray, initial: int = 0) -> np.ndarray:
+    """Returns the value of a register which loads `values` in the cycles where `update` is
+    set and keeps its value otherwise."""
+
+    index = np.maximum.accumulate(np.where(update, np.arange(len(update)), -1))
+    return np.where(index >= 0, values[np.maximum(index, 0)], initial)
+
+
+def restartable_sum(steps: np.ndarray, restart: np.ndarray) -> np.ndarray:
+    """Returns the running sum of `steps`, which is reset to 0 in the cycles where `restart`
+    is set."""
+
+    total = np.cumsum(np.where(restart, 0, steps))
+    return total - hold(total, restart)
+
+
+def delay(values: np.ndarray, cycles: int = 1, initial: int = 0) -> np.ndarray:
+    """Returns the values delayed by the given number of cycles (i.e. the value before the
+    edge instead of after it for `cycles=1`)."""
+
+    delayed = np.full(len(values), initial, dtype=np.int64)
+    if cycles < len(values):
+        delayed[cycles:] = values[: len(values) - cycles]
+    return delayed
+
+
+def parse_std_logic(value) -> int:
+    return int(str(value).strip("'\""))
+
+
+def up_down_counter(
+    enable: np.ndarray, direction: np.ndarray, reset: np.ndarray, modulus: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the count and overflow flag of a wrapping up/down counter from 0 to
+    `modulus - 1` with a synchronous reset (shared by `counter` and `bcd_counter`)."""
+
+    steps = np.where(enable == 1, np.where(direction == 1, 1, -1), 0)
+    count = np.mod(restartable_sum(steps, reset == 1), modulus)
+    count_before = delay(count)
+    wrapped = np.where(direction == 1, count_before == modulus - 1, count_before == 0)
+    overflow = hold(
+        np.where(reset == 1, 0, wrapped.astype(np.int64)), (reset == 1) | (enable == 1)
+    )
+    return count, overflow
+
+
+def counter_model(cycles: int, inputs: dict[str, np.ndarray], width=4, counter_max=None):
+    counter_max = 2 ** int(width) - 1 if counter_max is None else int(counter_max)
+    count, overflow = up_down_counter(
+        inputs["i_enable"], inputs["i_direction"], inputs["i_reset"], counter_max + 1
+    )
+    return {"o_count": count, "o_overflow": overflow}
+
+
+def bcd_counter_model(cycles: int, inputs: dict[str, np.ndarray], decimals=2):
+    decimals = int(decimals)
+    count, overflow = up_down_counter(
+        inputs["i_enable"], inputs["i_direction"], inputs["i_reset"], 10**decimals
+    )
+    # `o_decimals` is compared as a whole, digit `d` in bits `4 * d + 3 downto 4 * d`
+    packed = np.zeros(cycles, dtype=np.int64)
+    for digit in range(decimals):
+        packed |= ((count // 10**digit) % 10) << (4 * digit)
+    return {"o_decimals": packed, "o_overflow": overflow}
+
+
+def edge_detector_model(cycles: int, inputs: dict[str, np.ndarray]):
+    value = inputs["i_input"]
+    value_before = delay(value)
+    return {
+        "o_rising_edge": value & (1 - value_before),
+        "o_falling_edge": (1 - value) & value_before,
+        "o_any_edge": value ^ value_before,
+    }
+
+
+def clock_enable_generator_model(cycles: int, inputs: dict[str, np.ndarray], period=10):
+    return {"o_clk_ena": (np.arange(cycles) % int(period) == int(period) - 1).astype(np.int64)}
+
+
+def pwm_generator_model(cycles: int, inputs: dict[str, np.ndarray], resolution=2, polarity=1):
+    counter_max = 2 ** int(resolution) - 1
+    polarity = parse_std_logic(polarity)
+    enable, reset, duty = inputs["i_clk_ena"], inputs["i_reset"] == 1, inputs["i_duty"]
+    running = (enable == 1) & ~reset
+
+    counter_before = delay(np.mod(restartable_sum(running, reset), counter_max + 1))
+    period_end = counter_before == counter_max
+    duty_before = delay(hold(duty, reset | (running & period_end)))
+
+    pwm = np.where(
+        reset,
+        1 - polarity,
+        np.where(
+            period_end,
+            np.where(duty != 0, polarity, 1 - polarity),
+            np.where(
+                (duty_before != 0) & (counter_before < duty_before - 1), polarity, 1 - polarity
+            ),
+        ),
+    )
+    return {"o_pwm": hold(pwm, reset | running, initial=1 - polarity)}
+
+
+def debouncer_model(cycles: int, inputs: dict[str, np.ndarray], period=10):
+    # `i_input` passes a 2-stage synchronizer and one more register used for detecting changes
+    input_sync = delay(inputs["i_input"], 2)
+    changed = input_sync != delay(input_sync)
+    counting = (inputs["i_clk_ena"] == 1) & ~changed
+
+    counter_before = delay(np.mod(restartable_sum(counting, changed), int(period) + 1))
+    return {"o_output": hold(input_sync, counting & (counter_before == int(period)))}
+
+
+MODELS = {
+    "counter": CycleModel(
+        counter_model, ["i_enable", "i_direction", "i_reset"], ["o_count", "o_overflow"]
+    ),
+    "bcd_counter": CycleModel(
+        bcd_counter_model, ["i_enable", "i_direction", "i_reset"], ["o_decimals", "o_overflow"]
+    ),
+    "edge_detector": CycleModel(
+        edge_detector_model, ["i_input"], ["o_rising_edge", "o_falling_edge", "o_any_edge"]
+    ),
+    "clock_enable_generator": CycleModel(clock_enable_generator_model, [], ["o_clk_ena"]),
+    "pwm_generator": CycleModel(
+        pwm_generator_model, ["i_clk_ena", "i_reset", "i_duty"], ["o_pwm"]
+    ),
+    "debouncer": CycleModel(debouncer_model, ["i_input", "i_clk_ena"], ["o_output"]),
+}
+
+
+def simulate(
+    entity: str, inputs: dict[str, np.ndarray], cycles: int, generics: dict
+) -> dict[str, np.ndarray]:
+    """Runs the model of the entity (see `MODELS`). Unknown input values (-1, e.g. `U` before
+    the testbench drives an input) count as 0, like in the `= '1'` conditions of the VHDL."""
+
+    model = MODELS[entity]
+    inputs = {
+        name: np.maximum(np.asarray(inputs[name], dtype=np.int64), 0) for name in model.inputs
+    }
+    generics = {name.lower(): value for name, value in generics.items()}
+    return model.function(cycles, inputs, **generics)
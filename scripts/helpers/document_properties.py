@@ -0,0 +1,50 @@
+from helpers.extract_properties import Property
+
+
+def escape_markdown(text: str) -> str:
+    return text.replace("|", "&#124;")
+
+
+def generate_covers_section(properties: list[Property]) -> str:
+    """Returns the `## Covers` README section, or an empty string if there are no covers."""
+
+    covers = [p for p in properties if p.kind == "cover"]
+    if len(covers) == 0:
+        return ""
+
+    markdown = "## Covers\n\n"
+    markdown += "| Label | Condition |\n"
+    markdown += "|-----------|-----------|\n"
+    for cover in covers:
+        markdown += f"| {cover.label} | {escape_markdown(cover.condition)} |\n"
+    return markdown
+
+
+def generate_assumptions_section(properties: list[Property]) -> str:
+    """Returns the `## Assumptions` README section, or an empty string if there are no assumptions."""
+
+    assumptions = [p for p in properties if p.kind == "assume"]
+    if len(assumptions) == 0:
+        return ""
+
+    markdown = "## Assumptions\n\n"
+    markdown += "| Condition |\n"
+    markdown += "|-----------|\n"
+    for assumption in assumptions:
+        markdown += f"| {escape_markdown(assumption.condition)} |\n"
+    return markdown
+
+
+def generate_asserts_section(properties: list[Property]) -> str:
+    """Returns the `## Assertions` README section, or an empty string if there are no assertions."""
+
+    asserts = [p for p in properties if p.kind == "assert"]
+    if len(asserts) == 0:
+        return ""
+
+    markdown = "## Assertions\n\n"
+    markdown += "| Label | Condition |\n"
+    markdown += "|-------|-----------|\n"
+    for assertion in asserts:
+        markdown += f"| {assertion.label} | {escape_markdown(assertion.condition)} |\n"
+    return markdown
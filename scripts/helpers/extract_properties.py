@@ -0,0 +1,233 @@
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+# Kinds of PSL/VHDL verification statements recognized by the extractor
+PROPERTY_KINDS = ("assert", "assume", "cover")
+
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<newline>\n)
+    | (?P<whitespace>[ \t\r\f]+)
+    | (?P<psl_marker>--[ \t]*psl\b)
+    | (?P<comment>--[^\n]*)
+    | (?P<string>"(?:[^"\n]|"")*")
+    | (?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<number>[0-9][0-9_.#A-Fa-f]*)
+    | (?P<symbol>.)
+    """,
+    re.VERBOSE,
+)
+CHARACTER_LITERAL_PATTERN = re.compile(r"'.'")
+
+OPENING_BRACKETS = "([{"
+CLOSING_BRACKETS = ")]}"
+
+
+@dataclass
+class Token:
+    text: str
+    kind: str
+    line: int
+    space_before: bool
+
+
+@dataclass
+class Property:
+    """A single assert, assume or cover statement found in VHDL or PSL code."""
+
+    kind: str  # one of `PROPERTY_KINDS`
+    label: str
+    condition: str
+    report: str
+    severity: str
+    source_file: Path
+    line: int
+
+
+def tokenize(code: str) -> list[Token]:
+    """Splits VHDL or PSL code into tokens, dropping whitespace and comments. PSL statements
+    embedded in `-- psl` comments are tokenized as code, including the commented continuation
+    lines, until the statement is terminated by `;` outside of brackets (sequences such as
+    `{a; b}` contain `;` as well)."""
+
+    tokens: list[Token] = []
+    line = 1
+    space_before = False
+    inside_psl = False
+    psl_depth = 0
+    position = 0
+
+    while position < len(code):
+        # Character literals are told apart from attribute ticks (`signal'event`) by the previous token
+        if code[position] == "'" and (
+            not tokens or tokens[-1].kind != "identifier" and tokens[-1].text not in ")]"
+        ):
+            match = CHARACTER_LITERAL_PATTERN.match(code, position)
+            if match:
+                tokens.append(Token(match.group(), "character", line, space_before))
+                space_before = False
+                position = match.end()
+                continue
+
+        match = TOKEN_PATTERN.match(code, position)
+        kind = match.lastgroup
+        text = match.group()
+
+        if kind == "newline":
+            line += 1
+            space_before = True
+        elif kind == "whitespace":
+            space_before = True
+        elif kind == "psl_marker":
+            inside_psl = True
+            psl_depth = 0
+            space_before = True
+        elif kind == "comment":
+            space_before = True
+            if inside_psl:
+                # Continuation line of a commented PSL statement, skip only the comment marker
+                position += 2
+                continue
+        else:
+            tokens.append(Token(text, kind, line, space_before))
+            space_before = False
+            if text in OPENING_BRACKETS:
+                psl_depth += 1
+            elif text in CLOSING_BRACKETS:
+                psl_depth -= 1
+            elif text == ";" and psl_depth <= 0:
+                inside_psl = False
+
+        position = match.end()
+
+    return tokens
+
+
+def join_tokens(tokens: list[Token]) -> str:
+    """Joins the tokens back into a single line of code, with whitespace collapsed to a single space."""
+
+    text = ""
+    for index, token in enumerate(tokens):
+        if index > 0 and token.space_before:
+            text += " "
+        text += token.text
+    return text
+
+
+def strip_enclosing_brackets(tokens: list[Token]) -> list[Token]:
+    """Removes one pair of brackets (or braces) if they enclose the whole token list."""
+
+    if len(tokens) < 2 or tokens[0].text not in "({":
+        return tokens
+
+    depth = 0
+    for index, token in enumerate(tokens):
+        if token.text in OPENING_BRACKETS:
+            depth += 1
+        elif token.text in CLOSING_BRACKETS:
+            depth -= 1
+        if depth == 0:
+            return tokens[1:-1] if index == len(tokens) - 1 else tokens
+    return tokens
+
+
+def parse_statement(tokens: list[Token], start: int) -> tuple[list[list[Token]], int]:
+    """Splits the statement beginning at `tokens[start]` into its condition, report and severity
+    parts. Returns the parts and the index of the token terminating the statement."""
+
+    parts: list[list[Token]] = [[], [], []]
+    part = 0
+    depth = 0
+    index = start
+
+    while index < len(tokens):
+        token = tokens[index]
+        keyword = token.text.lower() if token.kind == "identifier" else ""
+        if token.text in OPENING_BRACKETS:
+            depth += 1
+        elif token.text in CLOSING_BRACKETS:
+            depth -= 1
+        if depth < 0 or (depth == 0 and token.text == ";"):
+            break
+        if depth == 0 and keyword == "report":
+            part = 1
+        elif depth == 0 and keyword == "severity":
+            part = 2
+        else:
+            parts[part].append(token)
+        index += 1
+
+    return parts, index
+
+
+def extract_properties_from_code(code: str, source_file: Path) -> list[Property]:
+    """Extracts all assert, assume and cover statements (including multi-line ones) from VHDL
+    or PSL code in a single pass over its tokens."""
+
+    tokens = tokenize(code)
+    properties: list[Property] = []
+    index = 0
+
+    while index < len(tokens):
+        token = tokens[index]
+        kind = token.text.lower()
+        if token.kind != "identifier" or kind not in PROPERTY_KINDS:
+            index += 1
+            continue
+
+        label = ""
+        line = token.line
+        if (
+            index >= 2
+            and tokens[index - 1].text == ":"
+            and tokens[index - 2].kind == "identifier"
+        ):
+            label = tokens[index - 2].text
+            line = tokens[index - 2].line
+
+        (condition, report, severity), index = parse_statement(tokens, index + 1)
+
+        report_text = join_tokens(report)
+        if len(report) == 1 and report[0].kind == "string":
+            report_text = report[0].text[1:-1].replace('""', '"')
+
+        properties.append(
+            Property(
+                kind=kind,
+                label=label,
+                condition=join_tokens(strip_enclosing_brackets(condition)),
+                report=report_text,
+                severity=join_tokens(severity),
+                source_file=source_file,
+                line=line,
+            )
+        )
+
+    return properties
+
+
+def extract_properties(source_file: Path) -> list[Property]:
+    """Extracts all assert, assume and cover statements from a `.vhd` file (including the PSL
+    statements within `-- psl` comments) or a `.psl` file."""
+
+    with open(source_file, "r", encoding="utf-8") as file:
+        code = file.read()
+    return extract_properties_from_code(code, source_file)
+
+
+if __name__ == "__main__":
+    # Checks the extraction of multi-line PSL statements, `;` within a sequence must not end
+    # the commented statement
+    code = (
+        "-- psl c1 : cover {a;\n"
+        "--    b; c};\n"
+        "-- psl a2 : assert always x;\n"
+    )
+    found = [
+        (item.kind, item.label, item.condition, item.line)
+        for item in extract_properties_from_code(code, Path("check.vhd"))
+    ]
+    expected = [("cover", "c1", "a; b; c", 1), ("assert", "a2", "always x", 3)]
+    assert found == expected, found
+    print("✅ PSL statements extracted correctly")
@@ -0,0 +1,108 @@
+import json
+import hashlib
+import threading
+from os import environ
+from pathlib import Path
+
+from vunit.ostools import Process
+from vunit.sim_if.ghdl import GHDLInterface
+
+from helpers.parse_vhdl import get_port_generics
+
+ELABORATION_DIRECTORY_NAME = "elaborated"
+
+
+class ElaborationCache:
+    """Elaborates each testbench once per run and reuses the executable for all of its VUnit
+    configurations which differ only in the top-level generics. The generics are passed to
+    the executable at run time (`-gNAME=VALUE`), like `ghdl --elab-run` does."""
+
+    def __init__(self, output_path: Path, testbench_index: dict) -> None:
+        self.output_path = output_path
+        self.testbench_index = testbench_index
+        self.binaries: dict[str, Path | None] = {}
+        self.locks: dict[str, threading.Lock] = {}
+        self.lock = threading.Lock()
+
+    def can_reuse(self, simulator: GHDLInterface, config, elaborate_only: bool) -> bool:
+        """Only the LLVM and GCC backends produce executables, coverage and `--elaborate`
+        runs are left to VUnit. Generics used in the ports of the top entity need to be
+        known at elaboration time, so such entities are elaborated for each configuration."""
+
+        if elaborate_only or not simulator._has_output_flag():
+            return False
+        if config.sim_options.get("enable_coverage", False):
+            return False
+        if config.vhdl_configuration_name is not None:
+            return False
+
+        entry = self.testbench_index["files"].get(config.entity_name)
+        if entry is None:
+            return False
+        code = Path(entry["path"]).read_text(encoding="utf-8", errors="replace")
+        port_generics = get_port_generics(code, config.entity_name)
+        return not port_generics & {name.lower() for name in config.generics}
+
+    def get_binary(self, command: list[str]) -> Path | None:
+        """Returns the executable elaborated by the `ghdl -e ... -o <binary>` command, running
+        the command first if no executable was elaborated by the same command yet. Returns
+        `None` if the elaboration failed."""
+
+        output_index = command.index("-o") + 1
+        key_command = command[:output_index] + command[output_index + 1 :]
+        key = hashlib.sha256(json.dumps(key_command).encode()).hexdigest()[:16]
+
+        with self.lock:
+            lock = self.locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self.binaries:
+                binary = self.output_path / ELABORATION_DIRECTORY_NAME / key / Path(
+                    command[output_index]
+                ).name
+                binary.parent.mkdir(parents=True, exist_ok=True)
+                command = command[:output_index] + [str(binary)] + command[output_index + 1 :]
+                try:
+                    Process(command).consume_output()
+                    self.binaries[key] = binary
+                except Process.NonZeroExitCode:
+                    self.binaries[key] = None
+            return self.binaries[key]
+
+
+def enable_elaboration_reuse(output_path: Path, testbench_index: dict) -> None:
+    """Replaces `GHDLInterface.simulate` so that the configurations of a testbench share a single
+    elaborated executable (see `ElaborationCache`), falling back to VUnit's `--elab-run`
+    whenever the executable cannot be reused."""
+
+    cache = ElaborationCache(Path(output_path), testbench_index)
+    simulate = GHDLInterface.simulate
+
+    def simulate_elaborated(self, output_path, test_suite_name, config, elaborate_only):
+        if self._gui or not cache.can_reuse(self, config, elaborate_only):
+            return simulate(self, output_path, test_suite_name, config, elaborate_only)
+
+        script_path = Path(output_path) / self.name
+        script_path.mkdir(parents=True, exist_ok=True)
+        wave_file = None
+        if self._viewer_fmt is not None:
+            wave_file = script_path / f"wave.{self._viewer_fmt}"
+            wave_file.unlink(missing_ok=True)
+
+        # With `ghdl_e`, VUnit returns the elaboration command and writes the simulation
+        # arguments (generics, assert level, wave file...) into `args.json`
+        command = self._get_command(
+            config, str(script_path), False, True, test_suite_name, wave_file
+        )
+        binary = cache.get_binary(command)
+        if binary is None:
+            return False
+        with open(script_path / "args.json", "r", encoding="utf-8") as file:
+            arguments = json.load(file)["sim"]
+
+        try:
+            Process([str(binary)] + arguments, env=environ.copy()).consume_output()
+        except Process.NonZeroExitCode:
+            return False
+        return True
+
+    GHDLInterface.simulate = simulate_elaborated
@@ -0,0 +1,87 @@
+import json
+import shutil
+import hashlib
+import subprocess
+from pathlib import Path
+
+from helpers.parse_vhdl import load_design_units, sort_by_dependencies
+
+GHDL_LIBRARY_DIRECTORY = Path("simulation/ghdl_work")
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+def get_ghdl_version(ghdl_path: str) -> str:
+    result = subprocess.run(
+        [ghdl_path, "--version"], capture_output=True, text=True, check=True
+    )
+    return result.stdout.splitlines()[0].strip() if result.stdout else "unknown"
+
+
+def hash_file(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def update_library(
+    ghdl_path: str,
+    vhd_files: list[Path],
+    library_directory: Path = GHDL_LIBRARY_DIRECTORY,
+) -> list[Path]:
+    """Analyses the VHDL files into the GHDL `work` library within `library_directory`.
+    Only the files whose hashes changed since the last analysis are analysed, along with all
+    files depending on them (GHDL treats those as obsolete otherwise). The library is rebuilt
+    from scratch if the GHDL version changed or a previously analysed file no longer exists.
+    Returns the list of analysed files."""
+
+    manifest_path = library_directory / MANIFEST_FILE_NAME
+    manifest = {"version": "", "files": {}}
+    if manifest_path.exists():
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+
+    version = get_ghdl_version(ghdl_path)
+    hashes = {path.as_posix(): hash_file(path) for path in vhd_files}
+    if manifest["version"] != version or not set(manifest["files"]) <= set(hashes):
+        print(f"Rebuilding GHDL library: {library_directory}")
+        shutil.rmtree(library_directory, ignore_errors=True)
+        manifest = {"version": version, "files": {}}
+    library_directory.mkdir(parents=True, exist_ok=True)
+
+    units = load_design_units(vhd_files)
+    outdated = {
+        path
+        for path in vhd_files
+        if manifest["files"].get(path.as_posix()) != hashes[path.as_posix()]
+    }
+
+    # Files depending on an outdated file need to be analysed again as well
+    changed = True
+    while changed:
+        outdated_units = set().union(*(units[path][0] for path in outdated))
+        dependents = {
+            path
+            for path, (_, referenced) in units.items()
+            if path not in outdated and referenced & outdated_units
+        }
+        outdated |= dependents
+        changed = bool(dependents)
+
+    analysed = [path for path in sort_by_dependencies(units) if path in outdated]
+    if analysed:
+        command = [
+            ghdl_path,
+            "-a",
+            "--std=08",
+            f"--workdir={library_directory.as_posix()}",
+            "--work=work",
+        ] + [path.as_posix() for path in analysed]
+        print(f"Running command: {' '.join(command)}")
+        subprocess.run(command, check=True, text=True)
+
+    manifest["files"] = hashes
+    with open(manifest_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+
+    print(
+        f"GHDL library up to date: {len(analysed)} of {len(vhd_files)} file(s) analysed."
+    )
+    return analysed
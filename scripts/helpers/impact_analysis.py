@@ -0,0 +1,85 @@
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from helpers.parse_sby import get_sby_files
+from helpers.parse_vhdl import get_dependent_files, load_design_units
+
+SOURCE_DIRECTORY = Path("source")
+TESTBENCH_DIRECTORY = Path("testbench")
+CONFIG_FILE_NAME = "vunit_config.py"
+DOCUMENT_FILE_NAME = "README.md"
+
+
+@dataclass
+class Impact:
+    files: list[Path] = field(default_factory=list)
+    entities: list[str] = field(default_factory=list)
+    testbenches: list[str] = field(default_factory=list)
+    sby_files: list[Path] = field(default_factory=list)
+    docs: list[Path] = field(default_factory=list)
+
+
+def find_design_files(roots: list[Path] | None = None) -> list[Path]:
+    return sorted(
+        path
+        for root in roots or [SOURCE_DIRECTORY, TESTBENCH_DIRECTORY]
+        for pattern in ["**/*.vhd", "**/*.psl"]
+        for path in root.glob(pattern)
+    )
+
+
+def get_changed_files(revision: str) -> list[Path]:
+    """Returns the files changed since the git revision (committed or not) and the new
+    untracked files."""
+
+    changed = subprocess.run(
+        ["git", "diff", "--name-only", revision], capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+    untracked = subprocess.run(
+        ["git", "ls-files", "--others", "--exclude-standard"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()
+    return [Path(path) for path in dict.fromkeys(changed + untracked)]
+
+
+def analyze_impact(changed_files: list[Path]) -> Impact:
+    """Returns everything affected by the changed files, based on the dependency graph of the
+    VHDL and PSL files in `source/` and `testbench/` (see `load_design_units`):
+
+    - entities: `source/<entity>/<entity>.vhd` files which are affected,
+    - testbenches: affected VHDL files in `testbench/`, along with the ones next to a changed
+      `vunit_config.py`,
+    - .sby files: the ones listing any affected file, or changed themselves,
+    - docs: `README.md` files next to affected entities and PSL files."""
+
+    changed = {Path(path) for path in changed_files}
+    units = load_design_units(find_design_files())
+    affected = sorted(get_dependent_files(units, changed))
+
+    impact = Impact(files=affected)
+    for path in affected:
+        if path.is_relative_to(TESTBENCH_DIRECTORY) and path.suffix == ".vhd":
+            impact.testbenches.append(path.stem)
+        elif path.is_relative_to(SOURCE_DIRECTORY):
+            if path.suffix == ".vhd" and path.stem == path.parent.name:
+                impact.entities.append(path.stem)
+            if path.stem == path.parent.name and (path.parent / DOCUMENT_FILE_NAME).exists():
+                impact.docs.append(path.parent / DOCUMENT_FILE_NAME)
+
+    for path in changed:
+        if path.name == CONFIG_FILE_NAME and path.is_relative_to(TESTBENCH_DIRECTORY):
+            impact.testbenches.extend(tb.stem for tb in sorted(path.parent.glob("*.vhd")))
+
+    affected_paths = {path.resolve() for path in affected}
+    for sby_file in sorted(TESTBENCH_DIRECTORY.glob("**/*.sby")):
+        if sby_file in changed or any(
+            path.resolve() in affected_paths for path in get_sby_files(sby_file)
+        ):
+            impact.sby_files.append(sby_file)
+
+    impact.testbenches = list(dict.fromkeys(impact.testbenches))
+    impact.docs = list(dict.fromkeys(impact.docs))
+    return impact
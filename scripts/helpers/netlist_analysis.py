@@ -0,0 +1,251 @@
+import re
+import gzip
+import json
+import shutil
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from helpers.synthesis_metrics import format_generics
+
+NETLIST_DIRECTORY = Path("simulation/synthesis/netlists")
+
+# Cells which start and end combinational paths (Yosys internal cells and `synth_xilinx` ones)
+SEQUENTIAL_CELL_PATTERN = re.compile(
+    r"^(\$_?\w*(dff|dlatch)\w*_?|\$sr|\$_SR_\w+|\$mem\w*|"
+    r"FD[A-Z]*|LD[A-Z]*|RAM\w*|SRL\w*|DSP48\w*)$",
+    re.IGNORECASE,
+)
+# Cells which only pass their input through and do not add a logic level
+PASS_THROUGH_CELLS = frozenset(["$pos", "$_BUF_", "$scopeinfo", "IBUF", "OBUF", "BUFG", "IOBUF"])
+# Clock inputs are left out of the fanout, a clock net drives every flip-flop by design
+CLOCK_PORTS = frozenset(["CLK", "C", "CLK_C", "RD_CLK", "WR_CLK"])
+
+
+@dataclass
+class ModuleGraph:
+    """Cells of a module as flat arrays of (bit, cell index) pairs of their inputs and outputs
+    (Yosys bit numbers, constants are left out). Instances of other modules of the netlist are
+    treated like flip-flops, so paths through them are cut at their ports."""
+
+    name: str
+    cell_names: list[str]
+    cell_types: list[str]
+    sequential: np.ndarray
+    input_bits: np.ndarray
+    input_cells: np.ndarray
+    output_bits: np.ndarray
+    output_cells: np.ndarray
+    port_output_bits: np.ndarray
+    bit_names: dict[int, str] = field(default_factory=dict)
+
+
+@dataclass
+class ModuleReport:
+    name: str
+    cell_counts: Counter
+    logic_depth: int
+    critical_path: list[tuple[str, str]]
+    high_fanout_nets: list[tuple[str, int]]
+    loop_cells: int
+
+
+def get_netlist_path(entity: str, generics: dict[str, str] | None = None) -> Path:
+    suffix = f"_{format_generics(generics)}" if generics else ""
+    return NETLIST_DIRECTORY / f"{entity}{suffix}.json.gz"
+
+
+def save_netlist(json_file_path: Path, entity: str, generics: dict[str, str] | None = None) -> Path:
+    """Keeps a gzip-compressed copy of the JSON netlist written by Yosys (`write_json`)."""
+
+    netlist_path = get_netlist_path(entity, generics)
+    netlist_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(json_file_path, "rb") as source, gzip.open(netlist_path, "wb") as target:
+        shutil.copyfileobj(source, target)
+    return netlist_path
+
+
+def load_netlist(netlist_path: Path) -> dict:
+    opener = gzip.open if netlist_path.suffix == ".gz" else open
+    with opener(netlist_path, "rt", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def get_top_module(netlist: dict) -> str | None:
+    for name, module in netlist["modules"].items():
+        if int(module.get("attributes", {}).get("top", "0"), 2):
+            return name
+    return next(iter(netlist["modules"]), None)
+
+
+def get_bits(bits: list) -> list[int]:
+    return [bit for bit in bits if isinstance(bit, int)]
+
+
+def build_module_graph(name: str, module: dict, module_names: set[str]) -> ModuleGraph:
+    cell_names, cell_types, sequential = [], [], []
+    input_bits, input_cells, output_bits, output_cells = [], [], [], []
+    for index, (cell_name, cell) in enumerate(module.get("cells", {}).items()):
+        directions = cell.get("port_directions", {})
+        for port, bits in cell.get("connections", {}).items():
+            bits = get_bits(bits)
+            if directions.get(port, "input") == "output":
+                output_bits.extend(bits)
+                output_cells.extend([index] * len(bits))
+            elif port not in CLOCK_PORTS:
+                input_bits.extend(bits)
+                input_cells.extend([index] * len(bits))
+        cell_names.append(cell_name)
+        cell_types.append(cell["type"])
+        sequential.append(
+            cell["type"] in module_names or bool(SEQUENTIAL_CELL_PATTERN.match(cell["type"]))
+        )
+
+    port_output_bits = [
+        bit
+        for port in module.get("ports", {}).values()
+        if port["direction"] != "input"
+        for bit in get_bits(port["bits"])
+    ]
+    graph = ModuleGraph(
+        name,
+        cell_names,
+        cell_types,
+        np.array(sequential, dtype=bool),
+        *(
+            np.array(values, dtype=np.int64)
+            for values in [input_bits, input_cells, output_bits, output_cells, port_output_bits]
+        ),
+    )
+    # Named nets take precedence over the ones generated by Yosys (`hide_name`)
+    for net_name, net in sorted(
+        module.get("netnames", {}).items(), key=lambda item: -item[1].get("hide_name", 0)
+    ):
+        for index, bit in enumerate(net["bits"]):
+            if isinstance(bit, int):
+                graph.bit_names[bit] = net_name if len(net["bits"]) == 1 else f"{net_name}[{index}]"
+    return graph
+
+
+def build_graphs(netlist: dict) -> dict[str, ModuleGraph]:
+    module_names = set(netlist["modules"])
+    return {
+        name: build_module_graph(name, module, module_names)
+        for name, module in netlist["modules"].items()
+    }
+
+
+def get_combinational_edges(graph: ModuleGraph) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the (driving cell, driven cell) pairs between combinational cells."""
+
+    bit_count = max(graph.input_bits.max(initial=0), graph.output_bits.max(initial=0)) + 1
+    driver = np.full(bit_count, -1, dtype=np.int64)
+    driver[graph.output_bits] = graph.output_cells
+    sources, targets = driver[graph.input_bits], graph.input_cells
+    combinational = ~graph.sequential
+    valid = sources >= 0
+    valid[valid] = combinational[sources[valid]] & combinational[targets[valid]]
+    # Cells connected by several bits are connected by a single edge
+    pairs = np.unique(sources[valid] * len(graph.cell_types) + targets[valid])
+    return np.divmod(pairs, len(graph.cell_types))
+
+
+def get_logic_depth(graph: ModuleGraph) -> tuple[int, list[int], int]:
+    """Returns the number of combinational cells on the longest path between flip-flops and
+    module ports (LUT levels for `synth_xilinx`), the cells of that path in order and the
+    number of cells on combinational loops, which are left out.
+
+    The cells are levelized in waves: every cell whose predecessors all have their level
+    gets its level at once, so there is one NumPy pass per cell on the longest path."""
+
+    cell_count = len(graph.cell_types)
+    sources, targets = get_combinational_edges(graph)
+    weights = np.array(
+        [cell_type not in PASS_THROUGH_CELLS for cell_type in graph.cell_types], dtype=np.int64
+    )
+    pending = np.bincount(targets, minlength=cell_count)
+    levels = np.zeros(cell_count, dtype=np.int64)
+    previous = np.full(cell_count, -1, dtype=np.int64)
+    ordered = np.zeros(cell_count, dtype=bool)
+
+    wave = ~graph.sequential & (pending == 0)
+    while wave.any():
+        # `levels` holds the highest level of the predecessors so far
+        levels[wave] += weights[wave]
+        ordered |= wave
+        selected = wave[sources]
+        wave_sources, wave_targets = sources[selected], targets[selected]
+
+        # The predecessor with the highest level of each target is the last one in this order
+        order = np.lexsort((levels[wave_sources], wave_targets))
+        wave_sources, wave_targets = wave_sources[order], wave_targets[order]
+        last = np.ones(len(wave_targets), dtype=bool)
+        last[:-1] = wave_targets[1:] != wave_targets[:-1]
+        best_sources, best_targets = wave_sources[last], wave_targets[last]
+        update = (previous[best_targets] < 0) | (levels[best_sources] > levels[best_targets])
+        levels[best_targets[update]] = levels[best_sources[update]]
+        previous[best_targets[update]] = best_sources[update]
+
+        pending -= np.bincount(wave_targets, minlength=cell_count)
+        wave = np.zeros(cell_count, dtype=bool)
+        wave[wave_targets] = True
+        wave &= (pending == 0) & ~ordered
+
+    loop_cells = int(np.count_nonzero(~graph.sequential & ~ordered))
+    levels[~ordered] = 0
+    if not levels.any():
+        return 0, [], loop_cells
+
+    index = int(np.argmax(levels))
+    path = [index]
+    while previous[path[-1]] >= 0:
+        path.append(int(previous[path[-1]]))
+    return int(levels[index]), path[::-1], loop_cells
+
+
+def get_fanout(graph: ModuleGraph) -> np.ndarray:
+    """Returns the number of cell inputs and output port bits each bit drives (indexed by bit
+    number), clock inputs are not counted."""
+
+    return np.bincount(np.concatenate([graph.input_bits, graph.port_output_bits]))
+
+
+def analyze_module(graph: ModuleGraph, top: int = 10) -> ModuleReport:
+    depth, path, loop_cells = get_logic_depth(graph)
+
+    fanout = get_fanout(graph)
+    high_fanout_nets = [
+        (graph.bit_names.get(bit, f"${bit}"), int(fanout[bit]))
+        for bit in np.argsort(-fanout, kind="stable")[:top].tolist()
+        if fanout[bit] > 1
+    ]
+    return ModuleReport(
+        name=graph.name,
+        cell_counts=Counter(graph.cell_types),
+        logic_depth=depth,
+        critical_path=[(graph.cell_names[index], graph.cell_types[index]) for index in path],
+        high_fanout_nets=high_fanout_nets,
+        loop_cells=loop_cells,
+    )
+
+
+def analyze_netlist(netlist: dict, top: int = 10) -> list[ModuleReport]:
+    """Analyzes each module of a Yosys JSON netlist: cell counts per type, logic depth with the
+    critical path and the `top` nets with the highest fanout."""
+
+    return [analyze_module(graph, top) for graph in build_graphs(netlist).values()]
+
+
+def get_netlist_metrics(reports: list[ModuleReport]) -> dict[str, int]:
+    """Returns the metrics recorded along with the `stat` output (see
+    `helpers.synthesis_metrics.record_metrics`), the worst ones of all modules."""
+
+    return {
+        "logic_depth": max((report.logic_depth for report in reports), default=0),
+        "max_fanout": max(
+            (fanout for report in reports for _, fanout in report.high_fanout_nets[:1]),
+            default=0,
+        ),
+    }
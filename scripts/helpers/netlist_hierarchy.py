@@ -0,0 +1,203 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
+from pathlib import Path
+from typing import Callable
+
+from helpers.add_svg_white_background import add_white_background
+from helpers.netlist_analysis import get_top_module
+
+RENDER_CACHE_DIRECTORY = Path("simulation/synthesis/renders")
+INDEX_FILE_NAME = "README.md"
+INDEX_SVG_FILE_NAME = "index.svg"
+TOP_ATTRIBUTE = "00000000000000000000000000000001"
+
+# Row height and indentation of the index SVG
+ROW_HEIGHT = 20
+INDENT_WIDTH = 24
+
+
+def get_module_file_name(module_name: str) -> str:
+    """Returns a file name for the module, Yosys names modules with non-default parameters like
+    `$paramod\\counter\\WIDTH=8`."""
+
+    return re.sub(r"[^\w.=-]+", "_", module_name).strip("_") + ".svg"
+
+
+def strip_source_attributes(value):
+    """Removes the `src` attributes (file and line of the VHDL code), which netlistsvg does not
+    render, so that editing unrelated code does not invalidate the cached renders."""
+
+    if isinstance(value, dict):
+        return {key: strip_source_attributes(item) for key, item in value.items() if key != "src"}
+    if isinstance(value, list):
+        return [strip_source_attributes(item) for item in value]
+    return value
+
+
+def split_netlist(netlist: dict) -> dict[str, dict]:
+    """Returns a standalone netlist for each module of a hierarchical Yosys JSON netlist, with
+    the module marked as the top one (netlistsvg renders the top module only). Instances of
+    other modules are rendered as boxes with the ports of the instance."""
+
+    return {
+        name: {
+            "modules": {
+                name: {
+                    **strip_source_attributes(module),
+                    "attributes": {"top": TOP_ATTRIBUTE},
+                }
+            }
+        }
+        for name, module in netlist["modules"].items()
+        if not int(module.get("attributes", {}).get("blackbox", "0"), 2)
+    }
+
+
+def get_hierarchy(netlist: dict, top: str) -> list[tuple[int, str]]:
+    """Returns (depth, module name) for each module of the hierarchy in depth-first order,
+    each module listed once, under its first instantiating module."""
+
+    modules = netlist["modules"]
+    rows = []
+    visited = set()
+
+    def visit(name: str, depth: int) -> None:
+        rows.append((depth, name))
+        visited.add(name)
+        for cell in modules[name].get("cells", {}).values():
+            if cell["type"] in modules and cell["type"] not in visited:
+                visit(cell["type"], depth + 1)
+
+    visit(top, 0)
+    return rows
+
+
+def get_module_hash(module_netlist: dict, skin_path: Path) -> str:
+    content = json.dumps(module_netlist, sort_keys=True).encode()
+    return hashlib.sha256(content + Path(skin_path).read_bytes()).hexdigest()[:16]
+
+
+def render_modules(
+    module_netlists: dict[str, dict],
+    output_directory: Path,
+    skin_path: Path,
+    render: Callable[[Path, Path], None],
+    max_workers: int | None = None,
+) -> dict[str, bool]:
+    """Renders each module into `output_directory` in parallel via `render(json_path, svg_path)`
+    (netlistsvg). The renders are cached by the hash of the module netlist and the skin in
+    `RENDER_CACHE_DIRECTORY`, so unchanged modules are copied instead of rendered again.
+    Returns whether each module was rendered (True) or taken from the cache (False)."""
+
+    RENDER_CACHE_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    output_directory.mkdir(parents=True, exist_ok=True)
+
+    def render_module(name: str, module_netlist: dict) -> bool:
+        module_hash = get_module_hash(module_netlist, skin_path)
+        cached_svg_path = RENDER_CACHE_DIRECTORY / f"{module_hash}.svg"
+        rendered = not cached_svg_path.exists()
+        if rendered:
+            # Parallel synthesis jobs may render the same module at the same time
+            suffix = f"{os.getpid()}_{threading.get_ident()}"
+            json_path = RENDER_CACHE_DIRECTORY / f"{module_hash}.{suffix}.json"
+            svg_path = RENDER_CACHE_DIRECTORY / f"{module_hash}.{suffix}.svg"
+            with open(json_path, "w", encoding="utf-8") as file:
+                json.dump(module_netlist, file)
+            try:
+                render(json_path, svg_path)
+                add_white_background(svg_path, minify=True)
+                os.replace(svg_path, cached_svg_path)
+            finally:
+                json_path.unlink(missing_ok=True)
+                svg_path.unlink(missing_ok=True)
+        shutil.copyfile(cached_svg_path, output_directory / get_module_file_name(name))
+        return rendered
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        futures = {
+            name: executor.submit(render_module, name, module_netlist)
+            for name, module_netlist in module_netlists.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def write_index(
+    netlist: dict, top: str, output_directory: Path, module_names: set[str]
+) -> tuple[Path, Path]:
+    """Writes a Markdown and an SVG index of the module hierarchy with links to the SVG of each
+    module and its cell counts."""
+
+    modules = netlist["modules"]
+    hierarchy = [row for row in get_hierarchy(netlist, top) if row[1] in module_names]
+    instances = Counter(
+        cell["type"] for module in modules.values() for cell in module.get("cells", {}).values()
+    )
+
+    def describe(name: str) -> str:
+        cells = len(modules[name].get("cells", {}))
+        description = f"{cells} cell{'s' if cells != 1 else ''}"
+        return description + (f", {instances[name]} instances" if instances[name] > 1 else "")
+
+    lines = [f"# Netlist of `{top}`", ""]
+    for depth, name in hierarchy:
+        lines.append(f"{'  ' * depth}- [`{name}`]({get_module_file_name(name)}) ({describe(name)})")
+    markdown_path = output_directory / INDEX_FILE_NAME
+    with open(markdown_path, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines) + "\n")
+
+    width = max(
+        INDENT_WIDTH * depth + 8 * len(f"{name} ({describe(name)})") + 20
+        for depth, name in hierarchy
+    )
+    height = ROW_HEIGHT * (len(hierarchy) + 1)
+    rows = [
+        f'<a xlink:href="{escape(get_module_file_name(name))}">'
+        f'<text x="{10 + INDENT_WIDTH * depth}" y="{ROW_HEIGHT * (index + 1)}">'
+        f"{escape(name)} ({describe(name)})</text></a>"
+        for index, (depth, name) in enumerate(hierarchy)
+    ]
+    svg_path = output_directory / INDEX_SVG_FILE_NAME
+    with open(svg_path, "w", encoding="utf-8") as file:
+        file.write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+            f'width="{width}" height="{height}" font-family="Courier New, monospace" '
+            f'font-size="12px">{"".join(rows)}</svg>'
+        )
+    add_white_background(svg_path)
+    return markdown_path, svg_path
+
+
+def render_hierarchy(
+    netlist: dict,
+    output_directory: Path,
+    skin_path: Path,
+    render: Callable[[Path, Path], None],
+    max_workers: int | None = None,
+) -> Path:
+    """Renders each module of the netlist into its own SVG in `output_directory` (see
+    `render_modules`), removes the SVGs of modules which no longer exist and writes the index
+    (see `write_index`). Returns the path to the Markdown index."""
+
+    top = get_top_module(netlist)
+    module_netlists = split_netlist(netlist)
+    rendered = render_modules(module_netlists, output_directory, skin_path, render, max_workers)
+    print(
+        f"Rendered {sum(rendered.values())} of {len(rendered)} modules "
+        f"({len(rendered) - sum(rendered.values())} unchanged) into {output_directory}"
+    )
+
+    expected = {get_module_file_name(name) for name in module_netlists} | {INDEX_SVG_FILE_NAME}
+    for svg_path in output_directory.glob("*.svg"):
+        if svg_path.name not in expected:
+            svg_path.unlink()
+            print(f"Removed: {svg_path}")
+
+    markdown_path, _ = write_index(netlist, top, output_directory, set(module_netlists))
+    return markdown_path
@@ -0,0 +1,119 @@
+import re
+from pathlib import Path
+
+SECTION_PATTERN = re.compile(r"^\[(?P<name>[^\]\s]+)(?:\s+(?P<argument>[^\]]*))?\]\s*$")
+
+
+def read_sby_sections(sby_file: Path) -> dict[str, list[str]]:
+    """Reads a `.sby` file and returns a dictionary of section name to the list of its
+    non-empty lines (comments excluded)."""
+
+    sections: dict[str, list[str]] = {}
+    current_section = None
+
+    with open(sby_file, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.rstrip()
+            match = SECTION_PATTERN.match(line)
+            if match:
+                current_section = match.group("name")
+                sections.setdefault(current_section, [])
+                continue
+            if current_section is None or not line.strip() or line.startswith("#"):
+                continue
+            sections[current_section].append(line)
+
+    return sections
+
+
+def get_sby_tasks(sby_file: Path) -> list[str]:
+    """Returns the names of all tasks listed in the `[tasks]` section of a `.sby` file.
+    Files without a `[tasks]` section return an empty list."""
+
+    tasks = []
+    for line in read_sby_sections(sby_file).get("tasks", []):
+        # Task lines may list several tasks and be followed by tags (`task_a task_b: tag`)
+        tasks.extend(line.split(":")[0].split())
+    return tasks
+
+
+def get_task_tags(sby_file: Path, task: str) -> set[str]:
+    """Returns the names a task is selected by in the other sections: its own name and the tags
+    listed after it in the `[tasks]` section (`task_a task_b: tag_a tag_b`)."""
+
+    tags = {task}
+    for line in read_sby_sections(sby_file).get("tasks", []):
+        tasks, _, line_tags = line.partition(":")
+        if task in tasks.split():
+            tags.update(line_tags.split())
+    return tags
+
+
+def get_sby_files(sby_file: Path) -> list[Path]:
+    """Returns the paths of all files listed in the `[files]` section of a `.sby` file.
+    Paths are resolved relative to the working directory or, if they do not exist there,
+    relative to the directory of the `.sby` file."""
+
+    files = []
+    for line in read_sby_sections(sby_file).get("files", []):
+        # Lines may either contain a single path or a destination name followed by the source path
+        files.append(resolve_sby_path(sby_file, line.split()[-1]))
+    return files
+
+
+def resolve_sby_path(sby_file: Path, path: str) -> Path:
+    resolved = Path(path)
+    if not resolved.exists() and (sby_file.parent / resolved).exists():
+        resolved = sby_file.parent / resolved
+    return resolved
+
+
+def get_task_option(sby_file: Path, task: str, option: str) -> str | None:
+    """Returns the value of the option in the `[options]` section which applies to the task
+    (lines without a task prefix apply to all tasks, prefixes may also be tags of the task),
+    or `None` if it is not set."""
+
+    tags = get_task_tags(sby_file, task)
+    value = None
+    for line in read_sby_sections(sby_file).get("options", []):
+        tasks, separator, setting = line.rpartition(":")
+        if separator and not tags & set(tasks.split()):
+            continue
+        name, _, option_value = setting.strip().partition(" ")
+        if name == option:
+            value = option_value.strip()
+    return value
+
+
+def replace_sby_sections(sby_text: str, replacements: dict[str, list[str]]) -> str:
+    """Returns the `.sby` file content with the lines of the given sections replaced."""
+
+    lines = []
+    replacing = False
+    for line in sby_text.splitlines():
+        match = SECTION_PATTERN.match(line.rstrip())
+        if match:
+            replacing = match.group("name") in replacements
+            lines.append(line)
+            if replacing:
+                lines.extend(replacements[match.group("name")])
+                lines.append("")
+            continue
+        if not replacing:
+            lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def set_task_option(option_lines: list[str], task: str, option: str, value: str) -> list[str]:
+    """Returns the `[options]` section lines with the option of the task set to the value.
+    Lines setting the option for the task (and only the task) are replaced, lines shared
+    with other tasks are kept and overridden by a task-specific line."""
+
+    lines = []
+    for line in option_lines:
+        tasks, separator, setting = line.rpartition(":")
+        if separator and tasks.split() == [task] and setting.split()[:1] == [option]:
+            continue
+        lines.append(line)
+    lines.append(f"{task}: {option} {value}" if task else f"{option} {value}")
+    return lines
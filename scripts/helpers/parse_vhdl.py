@@ -1,4 +1,10 @@
+import os
 import re
+import json
+import threading
+from pathlib import Path
+
+VHDL_GRAPH_PATH = Path("simulation/vhdl_graph.json")
 
 
 def uncomment_psl(code: str) -> str:
@@ -28,3 +34,189 @@ def uncomment_psl(code: str) -> str:
         )  # Remove non-PSL comments
 
     return "\n".join(cleaned_lines)
+
+
+COMMENT_PATTERN = re.compile(r"--.*")
+DECLARATION_PATTERN = re.compile(
+    r"^\s*(?:entity|package)\s+(?P<name>\w+)\s+is\b", re.IGNORECASE | re.MULTILINE
+)
+SECONDARY_UNIT_PATTERN = re.compile(
+    r"^\s*(?:package\s+body\s+|architecture\s+\w+\s+of\s+)(?P<name>\w+)",
+    re.IGNORECASE | re.MULTILINE,
+)
+WORK_REFERENCE_PATTERN = re.compile(r"\bwork\.(?P<name>\w+)", re.IGNORECASE)
+VUNIT_BINDING_PATTERN = re.compile(
+    r"^\s*vunit\s+\w+\s*\(\s*(?P<name>\w+)", re.IGNORECASE | re.MULTILINE
+)
+
+
+def parse_design_units(code: str) -> tuple[set[str], set[str]]:
+    """Returns the names of the design units (entities and packages) declared in the VHDL code
+    and the names of the units it depends on (via `use work.*`, `entity work.*`, package bodies
+    and architectures, or the entity a PSL `vunit` is bound to). All names are lowercase, units
+    declared in the code itself are not listed as dependencies."""
+
+    code = COMMENT_PATTERN.sub("", code)
+    declared = {m.group("name").lower() for m in DECLARATION_PATTERN.finditer(code)}
+    referenced = {m.group("name").lower() for m in WORK_REFERENCE_PATTERN.finditer(code)}
+    referenced |= {m.group("name").lower() for m in SECONDARY_UNIT_PATTERN.finditer(code)}
+    referenced |= {m.group("name").lower() for m in VUNIT_BINDING_PATTERN.finditer(code)}
+    return declared, referenced - declared
+
+
+def sort_by_dependencies(units: dict[Path, tuple[set[str], set[str]]]) -> list[Path]:
+    """Sorts the files so that each file comes after the files declaring the units it depends on
+    (i.e. in a valid analysis order). `units` maps each file to the result of `parse_design_units`.
+    Dependencies on units which are not declared by any of the files are ignored."""
+
+    declared_in = {
+        name: path for path, (declared, _) in units.items() for name in declared
+    }
+    order: list[Path] = []
+    visited: set[Path] = set()
+
+    def visit(path: Path) -> None:
+        if path in visited:
+            return
+        visited.add(path)
+        for name in sorted(units[path][1]):
+            if name in declared_in:
+                visit(declared_in[name])
+        order.append(path)
+
+    for path in sorted(units):
+        visit(path)
+    return order
+
+
+ENTITY_PATTERN = re.compile(
+    r"\bentity\s+(?P<name>\w+)\s+is\b(?P<header>.*?)\bend\b", re.IGNORECASE | re.DOTALL
+)
+PORT_CLAUSE_PATTERN = re.compile(r"\bport\s*\(", re.IGNORECASE)
+GENERIC_DECLARATION_PATTERN = re.compile(r"(?P<names>\w+(?:\s*,\s*\w+)*)\s*:(?!=)")
+IDENTIFIER_PATTERN = re.compile(r"\b\w+\b")
+
+
+def get_entity_generics(code: str, entity_name: str) -> set[str] | None:
+    """Returns the (lowercase) names of all generics of the entity, or `None` if the code does
+    not declare the entity."""
+
+    code = COMMENT_PATTERN.sub("", code)
+    for match in ENTITY_PATTERN.finditer(code):
+        if match.group("name").lower() != entity_name.lower():
+            continue
+        header = match.group("header")
+        port_clause = PORT_CLAUSE_PATTERN.search(header)
+        generic_clause = header[: port_clause.start()] if port_clause else header
+        return {
+            name.strip().lower()
+            for declaration in GENERIC_DECLARATION_PATTERN.finditer(generic_clause)
+            for name in declaration.group("names").split(",")
+        }
+    return None
+
+
+def get_port_generics(code: str, entity_name: str) -> set[str]:
+    """Returns the (lowercase) names of the generics of the entity which are used within its
+    port clause, e.g. to set the width of a port."""
+
+    code = COMMENT_PATTERN.sub("", code)
+    for match in ENTITY_PATTERN.finditer(code):
+        if match.group("name").lower() != entity_name.lower():
+            continue
+        header = match.group("header")
+        port_clause = PORT_CLAUSE_PATTERN.search(header)
+        if port_clause is None:
+            return set()
+
+        generics = get_entity_generics(match.group(), entity_name)
+        identifiers = {
+            identifier.lower()
+            for identifier in IDENTIFIER_PATTERN.findall(header[port_clause.end() :])
+        }
+        return generics & identifiers
+    return set()
+
+
+def get_dependency_closure(
+    units: dict[Path, tuple[set[str], set[str]]], names: set[str]
+) -> list[Path]:
+    """Returns the files declaring the given units (lowercase names) and, transitively, all
+    the units they depend on, in a valid analysis order (see `sort_by_dependencies`)."""
+
+    declared_in = {
+        name: path for path, (declared, _) in units.items() for name in declared
+    }
+    closure: set[Path] = set()
+    pending = [name for name in names if name in declared_in]
+    while pending:
+        path = declared_in[pending.pop()]
+        if path in closure:
+            continue
+        closure.add(path)
+        pending.extend(name for name in units[path][1] if name in declared_in)
+
+    return [path for path in sort_by_dependencies(units) if path in closure]
+
+
+def load_design_units(
+    paths: list[Path], graph_path: Path = VHDL_GRAPH_PATH
+) -> dict[Path, tuple[set[str], set[str]]]:
+    """Returns the result of `parse_design_units` for each file. The results are cached in
+    `graph_path` along with the modification time and size of each file, so only new and
+    modified files are parsed again."""
+
+    graph = {}
+    if graph_path.exists():
+        try:
+            with open(graph_path, "r", encoding="utf-8") as file:
+                graph = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            graph = {}
+
+    units = {}
+    changed = False
+    for path in paths:
+        stat = path.stat()
+        entry = graph.get(path.as_posix())
+        if entry is None or entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            declared, referenced = parse_design_units(
+                path.read_text(encoding="utf-8", errors="replace")
+            )
+            entry = {
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "declared": sorted(declared),
+                "referenced": sorted(referenced),
+            }
+            graph[path.as_posix()] = entry
+            changed = True
+        units[path] = set(entry["declared"]), set(entry["referenced"])
+
+    if changed:
+        # Written through a temporary file, so concurrent readers never see a partial file
+        graph_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = graph_path.with_name(
+            f"{graph_path.name}.{os.getpid()}_{threading.get_ident()}.tmp"
+        )
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(graph, file, indent=2, sort_keys=True)
+        os.replace(temporary_path, graph_path)
+    return units
+
+
+def get_dependent_files(
+    units: dict[Path, tuple[set[str], set[str]]], paths: set[Path]
+) -> set[Path]:
+    """Returns the given files and, transitively, all files depending on the units they
+    declare (i.e. the files affected by a change of the given ones)."""
+
+    affected = {path for path in paths if path in units}
+    pending = list(affected)
+    while pending:
+        declared = units[pending.pop()][0]
+        for path, (_, referenced) in units.items():
+            if path not in affected and referenced & declared:
+                affected.add(path)
+                pending.append(path)
+    return affected
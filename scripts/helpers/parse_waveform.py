@@ -0,0 +1,314 @@
+import re
+import fnmatch
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+TIMESCALE_PATTERN = re.compile(r"(?P<magnitude>\d+)\s*(?P<unit>[munpf]?s)")
+TIME_UNITS = {"s": 1, "ms": 1e-3, "us": 1e-6, "ns": 1e-9, "ps": 1e-12, "fs": 1e-15}
+
+# std_logic values are dumped by GHDL as they are, `H` and `L` count as `1` and `0`
+HIGH_VALUES = frozenset("1Hh")
+LOW_VALUES = frozenset("0Ll")
+WEAK_TRANSLATION = str.maketrans("HhLl", "1100")
+
+
+@dataclass
+class Signal:
+    """A variable declared in the VCD header, `name` is the full hierarchical name
+    (e.g. `vga_controller_tb.uut.h_sync`)."""
+
+    name: str
+    identifier: str
+    width: int
+    type: str
+
+
+@dataclass
+class SignalSummary:
+    """Activity of a signal over the whole dump. Times are in the units of the dump's
+    timescale (`WaveformSummary.timescale`). The duty cycle and edges are only tracked
+    for single-bit signals."""
+
+    signal: Signal
+    toggles: int = 0
+    high_time: int = 0
+    duty_cycle: float = float("nan")
+    rising_edges: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    falling_edges: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    final_value: str = ""
+
+
+@dataclass
+class WaveformSummary:
+    path: Path
+    timescale: float  # Length of one time unit of the dump in seconds
+    start_time: int
+    end_time: int
+    signals: dict[str, SignalSummary]
+
+
+class _SignalState:
+    """Mutable state of a selected signal while the value changes are streamed."""
+
+    __slots__ = ("value", "toggles", "high_since", "high_time", "rising", "falling")
+
+    def __init__(self) -> None:
+        self.value = ""
+        self.toggles = 0
+        self.high_since: int | None = None
+        self.high_time = 0
+        self.rising = array("q")
+        self.falling = array("q")
+
+
+def parse_timescale(text: str) -> float:
+    match = TIMESCALE_PATTERN.search(text)
+    if not match:
+        return 1e-15
+    return int(match.group("magnitude")) * TIME_UNITS[match.group("unit")]
+
+
+def read_vcd_header(file) -> tuple[float, list[Signal]]:
+    """Reads the VCD header up to `$enddefinitions`, leaving `file` positioned at the first
+    value change. Returns the timescale (in seconds) and the declared signals."""
+
+    timescale = 1e-15
+    signals: list[Signal] = []
+    scopes: list[str] = []
+    keyword = None
+    tokens: list[str] = []
+
+    for line in file:
+        for token in line.split():
+            if keyword is None:
+                keyword = token
+                tokens = []
+                continue
+            if token != "$end":
+                tokens.append(token)
+                continue
+
+            if keyword == "$timescale":
+                timescale = parse_timescale("".join(tokens))
+            elif keyword == "$scope":
+                scopes.append(tokens[-1])
+            elif keyword == "$upscope":
+                scopes.pop()
+            elif keyword == "$var":
+                # $var <type> <width> <identifier> <reference> [<range>] $end
+                name = ".".join(scopes + [tokens[3]])
+                signals.append(Signal(name, tokens[2], int(tokens[1]), tokens[0]))
+            elif keyword == "$enddefinitions":
+                return timescale, signals
+            keyword = None
+
+    raise ValueError("Missing $enddefinitions in VCD header")
+
+
+def check_wave_format(wave_path: Path) -> None:
+    """Only VCD files can be read, GHW is a binary format internal to GHDL without a stable
+    specification."""
+
+    if Path(wave_path).suffix != ".vcd":
+        raise ValueError(
+            f"Unsupported wave file format: {Path(wave_path).name}, "
+            "run the tests with `--viewer-fmt vcd` to get a VCD file instead."
+        )
+
+
+def list_signals(vcd_path: Path) -> list[Signal]:
+    check_wave_format(vcd_path)
+    with open(vcd_path, "r", encoding="utf-8", errors="replace") as file:
+        return read_vcd_header(file)[1]
+
+
+def select_signals(signals: list[Signal], patterns: list[str]) -> list[Signal]:
+    """Returns the signals whose full name (or the name without the scope) matches any of
+    the glob patterns, case-insensitively."""
+
+    patterns = [pattern.lower() for pattern in patterns]
+    return [
+        signal
+        for signal in signals
+        if any(
+            fnmatch.fnmatchcase(signal.name.lower(), pattern)
+            or fnmatch.fnmatchcase(signal.name.rsplit(".", 1)[-1].lower(), pattern)
+            for pattern in patterns
+        )
+    ]
+
+
+def summarize_vcd(vcd_path: Path, patterns: list[str] | None = None) -> WaveformSummary:
+    """Streams the value changes of the VCD file and summarizes the activity of the signals
+    matching `patterns` (all signals by default). The file is read line by line, value
+    changes of signals which were not selected are skipped, so the memory usage depends
+    only on the number of edges of the selected single-bit signals."""
+
+    with open(vcd_path, "r", encoding="utf-8", errors="replace") as file:
+        timescale, signals = read_vcd_header(file)
+        selected = select_signals(signals, patterns) if patterns else signals
+
+        # Several variables may share an identifier (e.g. a port and the signal connected to it)
+        states: dict[str, _SignalState] = {}
+        for signal in selected:
+            states.setdefault(signal.identifier, _SignalState())
+
+        time = 0
+        start_time = None
+        in_comment = False
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            first = line[0]
+
+            if in_comment:
+                in_comment = not line.endswith("$end")
+                continue
+            if first == "#":
+                time = int(line[1:])
+                if start_time is None:
+                    start_time = time
+                continue
+            if first == "$":
+                # $dumpvars/$dumpall/$dumpon/$dumpoff/$end only wrap value changes
+                in_comment = line.startswith("$comment") and not line.endswith("$end")
+                continue
+
+            if first in "bBrR":
+                value, identifier = line[1:].split(maxsplit=1)
+            else:
+                value, identifier = first, line[1:].strip()
+
+            state = states.get(identifier)
+            if state is None or state.value == value:
+                continue
+            if state.value:
+                state.toggles += 1
+
+            if value in HIGH_VALUES:
+                if state.high_since is None:
+                    state.high_since = time
+                if state.value in LOW_VALUES:
+                    state.rising.append(time)
+            else:
+                if state.high_since is not None:
+                    state.high_time += time - state.high_since
+                    state.high_since = None
+                if value in LOW_VALUES and state.value in HIGH_VALUES:
+                    state.falling.append(time)
+            state.value = value
+
+    start_time = start_time or 0
+    end_time = time
+    duration = end_time - start_time
+    summaries = {}
+    for signal in selected:
+        state = states[signal.identifier]
+        summary = SignalSummary(signal, toggles=state.toggles, final_value=state.value)
+        if signal.width == 1:
+            high_time = state.high_time
+            if state.high_since is not None:
+                high_time += end_time - state.high_since
+            summary.high_time = high_time
+            summary.duty_cycle = high_time / duration if duration else float("nan")
+            summary.rising_edges = np.frombuffer(state.rising, dtype=np.int64).copy()
+            summary.falling_edges = np.frombuffer(state.falling, dtype=np.int64).copy()
+        summaries[signal.name] = summary
+
+    return WaveformSummary(Path(vcd_path), timescale, start_time, end_time, summaries)
+
+
+def summarize_waveform(wave_path: Path, patterns: list[str] | None = None) -> WaveformSummary:
+    """Summarizes a wave file written by GHDL, see `check_wave_format`."""
+
+    check_wave_format(wave_path)
+    return summarize_vcd(Path(wave_path), patterns)
+
+
+def parse_vcd_value(value: str) -> int:
+    """Returns the value of a scalar or vector as an integer (`H`/`L` count as `1`/`0`),
+    or -1 if any of its bits is not `0` or `1` (e.g. `U` or `X`)."""
+
+    bits = value.translate(WEAK_TRANSLATION)
+    if bits.strip("01"):
+        return -1
+    return int(bits, 2)
+
+
+def sample_vcd(
+    vcd_path: Path, clock: Signal, signals: list[Signal]
+) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """Streams the VCD file and samples the signals at each rising edge of the clock,
+    taking the values they had right before the edge (i.e. the values a flip-flop clocked
+    by that edge sees). Returns the times of the edges and an array of the sampled values
+    (see `parse_vcd_value`) for each signal name."""
+
+    with open(vcd_path, "r", encoding="utf-8", errors="replace") as file:
+        read_vcd_header(file)
+
+        # Value of each identifier, and its value before the current time if it changed in it
+        identifiers = list(dict.fromkeys(signal.identifier for signal in signals))
+        values = {identifier: "U" for identifier in identifiers}
+        previous_values = dict(values)
+        changed: set[str] = set()
+        clock_value = "U"
+        clock_rose = False
+        edge_times = array("q")
+        samples: dict[str, list[str]] = {identifier: [] for identifier in identifiers}
+
+        def sample() -> None:
+            edge_times.append(time)
+            for identifier in identifiers:
+                source = previous_values if identifier in changed else values
+                samples[identifier].append(source[identifier])
+
+        time = 0
+        in_comment = False
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            first = line[0]
+
+            if in_comment:
+                in_comment = not line.endswith("$end")
+                continue
+            if first == "#":
+                if clock_rose:
+                    sample()
+                    clock_rose = False
+                time = int(line[1:])
+                changed.clear()
+                continue
+            if first == "$":
+                in_comment = line.startswith("$comment") and not line.endswith("$end")
+                continue
+
+            if first in "bBrR":
+                value, identifier = line[1:].split(maxsplit=1)
+            else:
+                value, identifier = first, line[1:].strip()
+
+            if identifier == clock.identifier:
+                clock_rose |= value in HIGH_VALUES and clock_value in LOW_VALUES
+                clock_value = value
+            if identifier in values:
+                if identifier not in changed:
+                    previous_values[identifier] = values[identifier]
+                    changed.add(identifier)
+                values[identifier] = value
+        if clock_rose:
+            sample()
+
+    sampled = {}
+    for signal in signals:
+        strings = samples[signal.identifier]
+        unique = {string: parse_vcd_value(string) for string in set(strings)}
+        sampled[signal.name] = np.fromiter(
+            (unique[string] for string in strings), dtype=np.int64, count=len(strings)
+        )
+    return np.frombuffer(edge_times, dtype=np.int64).copy(), sampled
@@ -2,7 +2,11 @@ import re
 from pathlib import Path
 
 
-from helpers.add_svg_white_background import add_white_background
+from helpers.add_svg_white_background import (
+    add_white_background,
+    load_svg_cache,
+    save_svg_cache,
+)
 
 # This script will iterate through all folders within source directory. It will read all Markdown files within each folder
 # and find the names of all used wavedrom SVGs. It will remove the unused wavedrom SVGs, and it will renamed the used
@@ -37,20 +41,29 @@ def find_used_svgs(markdown_files: list[Path]):
     return used_svgs
 
 
+def apply_rename_map(content: str, rename_map: dict[str, str]) -> tuple[str, int]:
+    """Replaces the old SVG filenames in `content` with the new ones. Returns the updated content
+    and the number of renamed references."""
+
+    renamed_refs = 0
+    for old_name, new_name in rename_map.items():
+        if old_name == new_name:
+            continue
+        content = content.replace(f"{old_name}", f"{new_name}")
+        renamed_refs += 1
+    return content, renamed_refs
+
+
 def update_markdown_references(
     markdown_files: list[Path], rename_map: dict[str, str]
 ) -> None:
     """Updates Markdown files to reflect the new SVG filenames."""
 
     for md_file in markdown_files:
-        content: str = md_file.read_text(encoding="utf-8")
-        renamed_refs = 0
-        for old_name, new_name in rename_map.items():
-            if old_name == new_name:
-                continue
-            content = content.replace(f"{old_name}", f"{new_name}")
-            renamed_refs += 1
-        md_file.write_text(content, encoding="utf-8")
+        original_content: str = md_file.read_text(encoding="utf-8")
+        content, renamed_refs = apply_rename_map(original_content, rename_map)
+        if content != original_content:
+            md_file.write_text(content, encoding="utf-8")
 
         if renamed_refs > 0:
             print(
@@ -68,51 +81,64 @@ def cleanup_and_rename_svgs(directory: Path):
     for entity_folder in directory.rglob("*"):
         if entity_folder.is_dir():
             markdown_files = list(entity_folder.glob("*.md"))
-
-            wavedrom_svg_files: list[Path] = [
-                f
-                for f in entity_folder.glob("wavedrom_*.svg")
-                if FILE_NAME_PATTERN.match(f.name)
-            ]
-
-            used_svgs = find_used_svgs(markdown_files)
-            entity_name = entity_folder.name
-
-            used_svg_set = set(used_svgs.get(entity_name, []))
-            rename_map: dict[str, str] = {}
-
-            # Remove unused SVGs
-            for svg_file in wavedrom_svg_files:
-                if svg_file.name not in used_svg_set:
-                    svg_file.unlink()
-                    print(f"Removed unused SVG: {svg_file}")
-
-            # Rename used SVGs and fix the Markdown file links to them
-            for index, old_svg_name in enumerate(used_svgs.get(entity_name, [])):
-                add_white_background(entity_folder / old_svg_name)
-
-                old_svg_path = entity_folder / old_svg_name
-                new_svg_name = f"{entity_name}_wavedrom_{index}.svg"
-                new_svg_path = entity_folder / new_svg_name
-
-                if old_svg_path == new_svg_path:
-                    continue
-
-                if old_svg_path.exists():
-                    try:
-                        old_svg_path.rename(new_svg_path)
-                    except FileExistsError:
-                        # If the new file name already exists, remove the old one and rename the new one
-                        new_svg_path.unlink()
-                        old_svg_path.rename(new_svg_path)
-                    rename_map[old_svg_name] = new_svg_name
-                    print(f"Renamed SVG: {old_svg_path} -> {new_svg_path}")
-
+            rename_map = rename_entity_svgs(entity_folder, markdown_files)
             update_markdown_references(markdown_files, rename_map)
-
-            svg_files: list[Path] = entity_folder.glob("*.svg")
-            for svg_file in svg_files:
-                add_white_background(svg_file)
+            add_white_backgrounds(entity_folder)
+
+
+def rename_entity_svgs(entity_folder: Path, markdown_files: list[Path]) -> dict[str, str]:
+    """Removes the WaveDrom SVGs of a single entity folder which are not used by its Markdown files
+    and renames the used ones. Returns the map of old to new SVG filenames, which is to be applied
+    to the Markdown files (see `update_markdown_references` and `apply_rename_map`)."""
+
+    wavedrom_svg_files: list[Path] = [
+        f
+        for f in entity_folder.glob("wavedrom_*.svg")
+        if FILE_NAME_PATTERN.match(f.name)
+    ]
+
+    used_svgs = find_used_svgs(markdown_files)
+    entity_name = entity_folder.name
+
+    used_svg_set = set(used_svgs.get(entity_name, []))
+    rename_map: dict[str, str] = {}
+
+    # Remove unused SVGs
+    for svg_file in wavedrom_svg_files:
+        if svg_file.name not in used_svg_set:
+            svg_file.unlink()
+            print(f"Removed unused SVG: {svg_file}")
+
+    # Rename used SVGs
+    for index, old_svg_name in enumerate(used_svgs.get(entity_name, [])):
+        old_svg_path = entity_folder / old_svg_name
+        new_svg_name = f"{entity_name}_wavedrom_{index}.svg"
+        new_svg_path = entity_folder / new_svg_name
+
+        if old_svg_path == new_svg_path:
+            continue
+
+        if old_svg_path.exists():
+            try:
+                old_svg_path.rename(new_svg_path)
+            except FileExistsError:
+                # If the new file name already exists, remove the old one and rename the new one
+                new_svg_path.unlink()
+                old_svg_path.rename(new_svg_path)
+            rename_map[old_svg_name] = new_svg_name
+            print(f"Renamed SVG: {old_svg_path} -> {new_svg_path}")
+
+    return rename_map
+
+
+def add_white_backgrounds(entity_folder: Path) -> None:
+    """Adds white backgrounds to the SVGs of the entity folder, skipping the ones which did not
+    change since the last run (see `load_svg_cache`)."""
+
+    cache = load_svg_cache()
+    for svg_file in sorted(entity_folder.glob("*.svg")):
+        add_white_background(svg_file, cache=cache)
+    save_svg_cache(cache)
 
 
 if __name__ == "__main__":
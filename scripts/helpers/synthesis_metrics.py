@@ -0,0 +1,222 @@
+import re
+import json
+import time
+import threading
+import subprocess
+from functools import cache
+from pathlib import Path
+
+SYNTHESIS_METRICS_DIRECTORY = Path("simulation/synthesis/metrics")
+SYNTHESIS_HISTORY_PATH = Path("simulation/synthesis/history.jsonl")
+
+# Metrics compared between commits, see `summarize_cell_types` and
+# `helpers.netlist_analysis.get_netlist_metrics`
+TRACKED_METRICS = [
+    "cells",
+    "luts",
+    "flip_flops",
+    "carry_cells",
+    "block_rams",
+    "dsps",
+    "logic_depth",
+    "max_fanout",
+]
+
+MODULE_HEADER_PATTERN = re.compile(r"^===\s*(?P<name>.+?)\s*===\s*$")
+# Older Yosys versions print `Number of cells: 22`, newer ones print `22 cells`
+OLD_STATISTIC_PATTERN = re.compile(r"^\s+Number of (?P<name>[\w ]+):\s+(?P<count>\d+)\s*$")
+NEW_STATISTIC_PATTERN = re.compile(
+    r"^\s+(?P<count>\d+)\s+(?P<name>wires|wire bits|public wires|public wire bits|"
+    r"ports|port bits|memories|memory bits|processes|cells)\s*$"
+)
+OLD_CELL_PATTERN = re.compile(r"^\s+(?P<type>\$?[\w$.\\]+)\s+(?P<count>\d+)\s*$")
+NEW_CELL_PATTERN = re.compile(r"^\s+(?P<count>\d+)\s+(?P<type>\$?[\w$.\\]+)\s*$")
+
+LUT_PATTERN = re.compile(r"^(LUT\d|\$lut)$", re.IGNORECASE)
+FLIP_FLOP_PATTERN = re.compile(r"^(FD[A-Z]*|\$_?\w*dff\w*_?)$", re.IGNORECASE)
+CARRY_PATTERN = re.compile(r"^CARRY\d$", re.IGNORECASE)
+BLOCK_RAM_PATTERN = re.compile(r"^RAMB\d+\w*$", re.IGNORECASE)
+DSP_PATTERN = re.compile(r"^DSP48\w*$", re.IGNORECASE)
+
+history_lock = threading.Lock()
+
+
+def parse_stat(stat_output: str) -> dict[str, dict]:
+    """Parses the output of the Yosys `stat` command into a dictionary of module name to its
+    statistics (`wires`, `cells` etc.) and per-cell-type counts (`cell_types`). The totals of
+    a hierarchical design are stored under the `design hierarchy` key."""
+
+    modules: dict[str, dict] = {}
+    module = None
+    in_cells = False
+
+    for line in stat_output.splitlines():
+        match = MODULE_HEADER_PATTERN.match(line)
+        if match:
+            module = {"cell_types": {}}
+            modules[match.group("name")] = module
+            in_cells = False
+            continue
+        if module is None or not line.strip():
+            continue
+
+        match = OLD_STATISTIC_PATTERN.match(line) or NEW_STATISTIC_PATTERN.match(line)
+        if match:
+            name = match.group("name").strip().replace(" ", "_")
+            module[name] = int(match.group("count"))
+            in_cells = name == "cells"
+            continue
+
+        match = in_cells and (OLD_CELL_PATTERN.match(line) or NEW_CELL_PATTERN.match(line))
+        if match:
+            module["cell_types"][match.group("type")] = int(match.group("count"))
+
+    return modules
+
+
+def summarize_cell_types(cell_types: dict[str, int]) -> dict[str, int]:
+    """Sums up the cell counts into resource categories (`synth_xilinx` cell names are recognized)."""
+
+    def count(pattern: re.Pattern) -> int:
+        return sum(n for cell, n in cell_types.items() if pattern.match(cell))
+
+    return {
+        "cells": sum(cell_types.values()),
+        "luts": count(LUT_PATTERN),
+        "flip_flops": count(FLIP_FLOP_PATTERN),
+        "carry_cells": count(CARRY_PATTERN),
+        "block_rams": count(BLOCK_RAM_PATTERN),
+        "dsps": count(DSP_PATTERN),
+    }
+
+
+def get_design_metrics(modules: dict[str, dict], top: str) -> dict:
+    """Returns the metrics of the whole design: the `design hierarchy` totals if present
+    (hierarchical design), the statistics of the top module otherwise."""
+
+    design = modules.get("design hierarchy") or modules.get(top)
+    if design is None:
+        # Module names might not match the entity name exactly (e.g. with generics), take the last one
+        design = list(modules.values())[-1] if modules else {"cell_types": {}}
+    metrics = summarize_cell_types(design["cell_types"])
+    metrics["cells"] = design.get("cells", metrics["cells"])
+    metrics["cell_types"] = design["cell_types"]
+    return metrics
+
+
+@cache
+def get_git_commit() -> str:
+    """Returns the short hash of the current commit, with `-dirty` suffix if there are
+    uncommitted changes to tracked files."""
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if status else commit
+
+
+def format_generics(generics: dict[str, str]) -> str:
+    return ",".join(f"{name}={value}" for name, value in sorted(generics.items()))
+
+
+def record_metrics(
+    entity: str,
+    generics: dict[str, str],
+    synthesis_command: str,
+    stat_output: str,
+    netlist_metrics: dict[str, int] | None = None,
+) -> dict:
+    """Parses the `stat` output, saves it as JSON into `SYNTHESIS_METRICS_DIRECTORY` and appends
+    it to the synthesis history (`SYNTHESIS_HISTORY_PATH`). Returns the saved record. The
+    metrics of the JSON netlist (logic depth and fanout) are added to the design metrics."""
+
+    modules = parse_stat(stat_output)
+    record = {
+        "commit": get_git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "entity": entity,
+        "generics": generics,
+        "synthesis_command": synthesis_command,
+        "metrics": {**get_design_metrics(modules, entity), **(netlist_metrics or {})},
+        "modules": modules,
+    }
+
+    SYNTHESIS_METRICS_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    suffix = f"_{format_generics(generics)}" if generics else ""
+    metrics_path = SYNTHESIS_METRICS_DIRECTORY / f"{entity}{suffix}.json"
+    with open(metrics_path, "w", encoding="utf-8") as file:
+        json.dump(record, file, indent=2)
+
+    with history_lock:
+        with open(SYNTHESIS_HISTORY_PATH, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+
+    return record
+
+
+def load_history(history_path: Path = SYNTHESIS_HISTORY_PATH) -> list[dict]:
+    if not history_path.exists():
+        return []
+    with open(history_path, "r", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def get_record_key(record: dict) -> tuple[str, str, str]:
+    """Records are compared only if they share the entity, generics and synthesis command."""
+
+    return (
+        record["entity"],
+        format_generics(record["generics"]),
+        record["synthesis_command"],
+    )
+
+
+def compare_metrics(
+    history: list[dict], base_commit: str, head_commit: str, threshold: float
+) -> list[dict]:
+    """Compares the latest records of `head_commit` against the latest records of `base_commit`.
+    Returns a list of rows, one per (design, metric), with `regression` set if the metric grew
+    by more than `threshold` percent."""
+
+    def latest(commit: str) -> dict[tuple, dict]:
+        return {get_record_key(r): r for r in history if r["commit"] == commit}
+
+    base_records = latest(base_commit)
+    head_records = latest(head_commit)
+
+    rows = []
+    for key in sorted(base_records.keys() & head_records.keys()):
+        base_metrics = base_records[key]["metrics"]
+        head_metrics = head_records[key]["metrics"]
+        for metric in TRACKED_METRICS:
+            if metric not in base_metrics or metric not in head_metrics:
+                # Recorded before the metric was introduced
+                continue
+            base = base_metrics.get(metric, 0)
+            head = head_metrics.get(metric, 0)
+            change = (head - base) / base * 100 if base else (100.0 if head else 0.0)
+            rows.append(
+                {
+                    "entity": key[0],
+                    "generics": key[1],
+                    "synthesis_command": key[2],
+                    "metric": metric,
+                    "base": base,
+                    "head": head,
+                    "change": change,
+                    "regression": change > threshold,
+                }
+            )
+    return rows
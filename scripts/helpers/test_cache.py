@@ -0,0 +1,114 @@
+import json
+import hashlib
+import subprocess
+from pathlib import Path
+
+from helpers.test_history import lock_file, write_json
+
+VUNIT_CACHE_PATH = Path("simulation/vunit_cache.json")
+
+
+def load_test_cache(cache_path: Path = VUNIT_CACHE_PATH) -> dict[str, str]:
+    """Returns the tests which passed in the previous runs, as test name to the key of the
+    inputs they passed with (see `get_test_key`)."""
+
+    if not cache_path.exists():
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_test_cache(cache: dict[str, str], cache_path: Path = VUNIT_CACHE_PATH) -> None:
+    write_json(cache_path, cache)
+
+
+def get_simulator_version(simulator_if) -> str:
+    """Returns the first line of `<simulator> --version` (e.g. GHDL's version and backend)."""
+
+    if simulator_if is None:
+        return ""
+    executable = Path(simulator_if._prefix) / simulator_if.executable
+    try:
+        result = subprocess.run(
+            [str(executable), "--version"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return simulator_if.name
+    return f"{simulator_if.name} {result.stdout.splitlines()[0].strip() if result.stdout else ''}"
+
+
+def hash_files(paths: list[Path]) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(path.as_posix().encode())
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def get_test_key(config, dependency_hash: str, simulator_version: str) -> str:
+    """Returns the hash of everything a test result depends on: the files in the dependency
+    closure of its testbench, its generics and simulation options and the simulator version.
+    `runner_cfg` is set by VUnit for each run (output path etc.) and is left out, and so is
+    the selection of the dumped signals (`--read-wave-opt`)."""
+
+    inputs = {
+        "dependencies": dependency_hash,
+        "simulator": simulator_version,
+        "generics": {
+            name: str(value)
+            for name, value in config.generics.items()
+            if name.lower() != "runner_cfg"
+        },
+        "sim_options": {
+            name: str([v for v in value if not str(v).startswith("--read-wave-opt")])
+            if name == "ghdl.sim_flags"
+            else str(value)
+            for name, value in config.sim_options.items()
+        },
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def split_cached_suites(
+    test_suites: list, cache: dict[str, str], test_keys: dict[str, str]
+) -> tuple[list, list]:
+    """Splits the test suites (VUnit objects with `test_names`) into the ones which need to run
+    and the ones whose tests all passed before with the same key (`test_keys` holds the keys
+    of the current run)."""
+
+    to_run, cached = [], []
+    for suite in test_suites:
+        if all(cache.get(name) == test_keys[name] for name in suite.test_names):
+            cached.append(suite)
+        else:
+            to_run.append(suite)
+    return to_run, cached
+
+
+def record_passed_tests(
+    cache: dict[str, str], report, test_keys: dict[str, str]
+) -> None:
+    """Updates the cache with the results of a VUnit run (`vunit.ui.results.Report`): passed
+    tests are stored with their key, failed ones are removed."""
+
+    for test_name, result in report.tests.items():
+        if result.status == "passed" and test_name in test_keys:
+            cache[test_name] = test_keys[test_name]
+        elif result.status == "failed":
+            cache.pop(test_name, None)
+
+
+def update_test_cache(
+    report, test_keys: dict[str, str], cache_path: Path = VUNIT_CACHE_PATH
+) -> dict[str, str]:
+    """Merges the results of a VUnit run into the cache file as it is on disk now (see
+    `record_passed_tests`), keeping the entries written by concurrent runs."""
+
+    with lock_file(cache_path):
+        cache = load_test_cache(cache_path)
+        record_passed_tests(cache, report, test_keys)
+        save_test_cache(cache, cache_path)
+    return cache
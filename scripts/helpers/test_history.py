@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import argparse
+from contextlib import contextmanager
+from pathlib import Path
+
+VUNIT_HISTORY_PATH = Path("simulation/vunit_history.json")
+# The history the shards of the current sharded run are partitioned by
+VUNIT_SHARD_SNAPSHOT_PATH = Path("simulation/vunit_shard_snapshot.json")
+# Locks older than this are left over from a killed run and are taken over
+STALE_LOCK_SECONDS = 60.0
+
+
+@contextmanager
+def lock_file(path: Path):
+    """Holds `<path>.lock` while the block runs, so that concurrent runs (e.g. shards in
+    several terminals) read, merge and write the JSON file one at a time. The lock file is
+    created exclusively, which works the same on Windows and Linux."""
+
+    lock_path = path.with_name(f"{path.name}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > STALE_LOCK_SECONDS:
+                    lock_path.unlink(missing_ok=True)
+            except FileNotFoundError:
+                pass
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        lock_path.unlink(missing_ok=True)
+
+
+def write_json(path: Path, data: dict) -> None:
+    """Writes the JSON file through a temporary file, so readers never see a partial file."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+    os.replace(temporary_path, path)
+
+
+def load_test_history(history_path: Path = VUNIT_HISTORY_PATH) -> dict[str, dict]:
+    """Returns the last recorded result of each test, as test name to `status` and wall
+    `time` in seconds."""
+
+    if not history_path.exists():
+        return {}
+    try:
+        with open(history_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_test_history(history: dict[str, dict], history_path: Path = VUNIT_HISTORY_PATH) -> None:
+    write_json(history_path, history)
+
+
+def record_test_results(history: dict[str, dict], report) -> None:
+    """Updates the history with the results of a VUnit run (`vunit.ui.results.Report`).
+    Skipped tests keep their previous record."""
+
+    for test_name, result in report.tests.items():
+        if result.status == "skipped":
+            continue
+        history[test_name] = {"status": result.status, "time": result.time}
+
+
+def update_test_history(report, history_path: Path = VUNIT_HISTORY_PATH) -> dict[str, dict]:
+    """Merges the results of a VUnit run into the history file as it is on disk now, so the
+    results of runs which finished in the meantime (e.g. other shards) are kept. Returns the
+    updated history."""
+
+    with lock_file(history_path):
+        history = load_test_history(history_path)
+        record_test_results(history, report)
+        save_test_history(history, history_path)
+    return history
+
+
+def parse_shard(text: str) -> tuple[int, int]:
+    """Parses `i/N` (1 <= i <= N) into `(i, N)`."""
+
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid shard: {text}, expected i/N")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"Invalid shard: {text}, expected 1 <= i <= N")
+    return index, count
+
+
+def load_shard_history(
+    shard: tuple[int, int],
+    register: bool = True,
+    history_path: Path = VUNIT_HISTORY_PATH,
+    snapshot_path: Path = VUNIT_SHARD_SNAPSHOT_PATH,
+) -> dict[str, dict]:
+    """Returns the history the shards (`shard` is `(i, N)`) are partitioned by. The first shard
+    of a sharded run takes a snapshot of the history, which the other shards of the run reuse,
+    so the results written by shards which finish earlier do not change the partitions. A new
+    run starts when a shard which already started in the current run starts again, or with a
+    different `N`. If `register` is false (e.g. `--list`), the shard is not marked as started."""
+
+    index, count = shard
+    with lock_file(snapshot_path):
+        snapshot = load_test_history(snapshot_path)
+        if snapshot.get("count") != count or index in snapshot.get("started", []):
+            snapshot = {
+                "count": count,
+                "started": [],
+                "finished": [],
+                "history": load_test_history(history_path),
+            }
+            if not register:
+                return snapshot["history"]
+        if register:
+            snapshot["started"].append(index)
+            write_json(snapshot_path, snapshot)
+    return snapshot["history"]
+
+
+def finish_shard(shard: tuple[int, int], snapshot_path: Path = VUNIT_SHARD_SNAPSHOT_PATH) -> None:
+    """Marks the shard as finished, the snapshot is removed once all shards of the run are."""
+
+    index, count = shard
+    with lock_file(snapshot_path):
+        snapshot = load_test_history(snapshot_path)
+        if snapshot.get("count") != count:
+            return
+        snapshot["finished"] = sorted(set(snapshot["finished"]) | {index})
+        if len(snapshot["finished"]) == count:
+            snapshot_path.unlink(missing_ok=True)
+        else:
+            write_json(snapshot_path, snapshot)
+
+
+def get_suite_time(suite, history: dict[str, dict]) -> float:
+    """Returns the recorded wall time of the test suite (a VUnit object with `test_names`).
+    Tests without history are assumed to take the mean time of the known ones."""
+
+    known_times = [record["time"] for record in history.values()]
+    default_time = sum(known_times) / len(known_times) if known_times else 1.0
+    return sum(history.get(name, {}).get("time", default_time) for name in suite.test_names)
+
+
+def select_shard(test_suites: list, shard: tuple[int, int], history: dict[str, dict]) -> list:
+    """Returns the test suites of the `i`-th of `N` partitions of about the same total runtime
+    (`shard` is `(i, N)`): longest processing time first, each suite goes to the partition
+    with the lowest total so far. Ties are broken by the test names, so every shard run with
+    the same history (see `load_shard_history`) gets a disjoint slice of the same suite."""
+
+    index, count = shard
+    suites = sorted(test_suites, key=lambda suite: suite.test_names)
+    suites.sort(key=lambda suite: get_suite_time(suite, history), reverse=True)
+    totals = [0.0] * count
+    partitions: list[list] = [[] for _ in range(count)]
+    for suite in suites:
+        partition = totals.index(min(totals))
+        partitions[partition].append(suite)
+        totals[partition] += get_suite_time(suite, history)
+    return partitions[index - 1]
+
+
+def schedule_test_suites(test_suites: list, history: dict[str, dict]) -> list:
+    """Orders the test suites (VUnit objects with a `test_names` attribute) so that the ones
+    which failed in their last run go first, followed by the rest from the longest to the
+    shortest. Tests without history are assumed to take the mean time of the known ones."""
+
+    def has_failed(suite) -> bool:
+        return any(history.get(name, {}).get("status") == "failed" for name in suite.test_names)
+
+    # Sorting by name first makes the order of suites with equal times deterministic
+    suites = sorted(test_suites, key=lambda suite: suite.test_names)
+    suites.sort(key=lambda suite: get_suite_time(suite, history), reverse=True)
+    suites.sort(key=lambda suite: not has_failed(suite))
+    return suites
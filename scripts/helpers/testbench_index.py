@@ -0,0 +1,79 @@
+import os
+import json
+import importlib.util
+from types import ModuleType
+from pathlib import Path
+
+TESTBENCH_DIRECTORY = Path("testbench")
+TESTBENCH_INDEX_PATH = Path("simulation/testbench_index.json")
+CONFIG_FILE_NAME = "vunit_config.py"
+
+
+def scan_testbenches(root: Path = TESTBENCH_DIRECTORY) -> dict:
+    """Walks `root` once and returns the index of all VHDL files within it: file stem to its
+    path and the path of the `vunit_config.py` next to it (if any). The modification times
+    of all walked directories are stored as well, as adding, removing or renaming a file
+    changes the modification time of its directory."""
+
+    index = {"directories": {}, "files": {}}
+    for directory, _, file_names in os.walk(root):
+        directory = Path(directory)
+        index["directories"][directory.as_posix()] = directory.stat().st_mtime_ns
+        config_path = directory / CONFIG_FILE_NAME
+        for file_name in sorted(file_names):
+            if not file_name.endswith(".vhd"):
+                continue
+            index["files"].setdefault(
+                file_name.removesuffix(".vhd"),
+                {
+                    "path": (directory / file_name).as_posix(),
+                    "config": config_path.as_posix() if CONFIG_FILE_NAME in file_names else "",
+                },
+            )
+    return index
+
+
+def is_index_valid(index: dict) -> bool:
+    for directory, mtime in index["directories"].items():
+        try:
+            if Path(directory).stat().st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def load_testbench_index(
+    root: Path = TESTBENCH_DIRECTORY, index_path: Path = TESTBENCH_INDEX_PATH
+) -> dict:
+    """Returns the index of `scan_testbenches`, loaded from `index_path` if none of the indexed
+    directories changed since it was saved, scanning `root` again (and saving it) otherwise."""
+
+    if index_path.exists():
+        try:
+            with open(index_path, "r", encoding="utf-8") as file:
+                index = json.load(file)
+            if index.get("root") == root.as_posix() and is_index_valid(index):
+                return index
+        except (OSError, json.JSONDecodeError, KeyError):
+            pass
+
+    index = scan_testbenches(root)
+    index["root"] = root.as_posix()
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(index_path, "w", encoding="utf-8") as file:
+        json.dump(index, file, indent=2)
+    return index
+
+
+def load_config_module(config_path: Path, modules: dict[str, ModuleType]) -> ModuleType:
+    """Imports the `vunit_config.py` module, each file is imported only once (`modules` holds
+    the modules imported so far, keyed by their path)."""
+
+    key = Path(config_path).as_posix()
+    if key not in modules:
+        spec = importlib.util.spec_from_file_location("config", key)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        modules[key] = module
+    return modules[key]
@@ -0,0 +1,60 @@
+import re
+from pathlib import Path
+
+WAVE_OPTION_DIRECTORY = Path("simulation/wave_opt")
+# Optional list of additional signals (one hierarchical path or glob per line) next to the testbench
+WAVE_SIGNALS_FILE_NAME = "wave_signals.txt"
+
+VARIABLE_REFERENCE_PATTERN = re.compile(
+    r"variable_ref:\s*\(\s*path:\s*\(\s*strs:\s*\[(?P<path>[^\]]*)\]\s*,?\s*\)\s*,"
+    r"\s*name:\s*\"(?P<name>[^\"]*)\""
+)
+STRING_PATTERN = re.compile(r"\"(?P<string>[^\"]*)\"")
+
+
+def get_state_signals(state_file: Path) -> list[str]:
+    """Returns the GHDL paths (e.g. `/double_dabble_tb/inst_uut/current_state`) of the signals
+    displayed in the Surfer state file. Elements of composite signals (e.g. `[1]`) are
+    replaced by the whole signal, GHDL cannot dump them separately."""
+
+    content = state_file.read_text(encoding="utf-8", errors="replace")
+    signals = []
+    for match in VARIABLE_REFERENCE_PATTERN.finditer(content):
+        path = [m.group("string") for m in STRING_PATTERN.finditer(match.group("path"))]
+        name = match.group("name")
+        if not name.startswith("["):
+            path.append(name)
+        signals.append("/" + "/".join(path).lower())
+    return list(dict.fromkeys(signals))
+
+
+def get_wave_signals(testbench_directory: Path) -> list[str]:
+    """Returns the signals to be dumped for the testbench: the ones displayed in any of its
+    `*surf.ron` state files and the ones listed in its `wave_signals.txt`. An empty list
+    means that there is no selection and all signals should be dumped."""
+
+    signals = []
+    for state_file in sorted(testbench_directory.glob("*surf.ron")):
+        signals += get_state_signals(state_file)
+
+    signals_file = testbench_directory / WAVE_SIGNALS_FILE_NAME
+    if signals_file.exists():
+        for line in signals_file.read_text(encoding="utf-8").splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                signals.append(line if line.startswith("/") else "/" + line)
+    return list(dict.fromkeys(signals))
+
+
+def write_wave_option_file(
+    testbench_name: str, signals: list[str], directory: Path = WAVE_OPTION_DIRECTORY
+) -> Path:
+    """Writes the signals into a wave option file for GHDL's `--read-wave-opt` option and
+    returns its path. The file is only rewritten if its content changed."""
+
+    content = "$ version 1.1\n" + "".join(f"{signal}\n" for signal in signals)
+    path = directory / f"{testbench_name}.opt"
+    if not path.exists() or path.read_text(encoding="utf-8") != content:
+        directory.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    return path
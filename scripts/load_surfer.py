@@ -1,4 +1,8 @@
+import os
+import re
 import sys
+import json
+import bisect
 import subprocess
 import fnmatch
 import argparse
@@ -11,6 +15,7 @@ TESTBENCH_DIRECTORY = "testbench"
 TEST_OUTPUT_DIRECTORY = "simulation/vunit_out/test_output/"
 MAPPING_FILE_PATH = TEST_OUTPUT_DIRECTORY + "test_name_to_path_mapping.txt"
 WAVE_FILE_EXTENSIONS = [".ghw", ".vcd"]
+INDEX_FILE_PATH = "simulation/surfer_index.json"
 
 
 def run_command(command, cwd=None):
@@ -24,14 +29,103 @@ def run_command(command, cwd=None):
     )
 
 
-def find_matching_test(pattern: str) -> tuple[str, str]:
+def get_testbench_name(test_name: str) -> str:
+    # Assume that the testbench name is the second dot-separated member of the test name
+    return test_name.split(".")[1].removesuffix("_tb")
+
+
+def find_wave_file(test_folder: str) -> str:
+    for extension in WAVE_FILE_EXTENSIONS:
+        wave_file = Path(TEST_OUTPUT_DIRECTORY) / test_folder / "ghdl" / f"wave{extension}"
+        if wave_file.exists():
+            return str(wave_file)
+    return ""
+
+
+def build_index() -> dict:
+    """Builds the index of all tests listed in the VUnit mapping file. For each test it stores
+    its output folder, its wave file (if any) and the candidate state files found within
+    the testbench directory. `TESTBENCH_DIRECTORY` is walked only once. Tests are stored
+    sorted by name."""
+
     tests: dict[str, str] = {}  # test_name: test_folder_name
     with open(MAPPING_FILE_PATH, "r") as file:
         reader = csv.reader(file, delimiter=" ")
         for row in reader:
             tests[" ".join(row[1:])] = row[0]
 
-    matches = [key for key in tests if fnmatch.fnmatch(key, pattern)]
+    testbench_directories: dict[str, Path] = {}
+    for entity in Path(TESTBENCH_DIRECTORY).rglob("*"):
+        if entity.is_dir():
+            testbench_directories.setdefault(entity.name, entity)
+
+    state_files: dict[str, list[str]] = {}  # testbench_name: state files
+    index = {"mapping_mtime": Path(MAPPING_FILE_PATH).stat().st_mtime_ns, "tests": {}}
+    for test_name, test_folder in sorted(tests.items()):
+        testbench_name = get_testbench_name(test_name)
+        if testbench_name not in state_files:
+            directory = testbench_directories.get(testbench_name)
+            state_files[testbench_name] = (
+                [str(path) for path in sorted(directory.glob("*surf.ron"))]
+                if directory
+                else []
+            )
+
+        index["tests"][test_name] = {
+            "folder": test_folder,
+            "testbench_found": testbench_name in testbench_directories,
+            "wave_file": find_wave_file(test_folder),
+            "state_files": state_files[testbench_name],
+        }
+
+    return index
+
+
+def load_index() -> dict:
+    """Loads the persistent test index, rebuilding it if the VUnit mapping file changed since."""
+
+    mapping_mtime = Path(MAPPING_FILE_PATH).stat().st_mtime_ns
+    index_path = Path(INDEX_FILE_PATH)
+    if index_path.exists():
+        try:
+            with open(index_path, "r", encoding="utf-8") as file:
+                index = json.load(file)
+            if index.get("mapping_mtime") == mapping_mtime:
+                return index
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    index = build_index()
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(index_path, "w", encoding="utf-8") as file:
+        json.dump(index, file)
+    return index
+
+
+def match_tests(test_names: list[str], pattern: str) -> list[str]:
+    """Returns the test names matching the glob pattern. `test_names` must be sorted, so that
+    only the names sharing the literal prefix of the pattern need to be matched."""
+
+    if os.path.normcase("A") != "A":
+        # `fnmatch` ignores case on Windows, which the sorted prefix search cannot
+        return [name for name in test_names if fnmatch.fnmatch(name, pattern)]
+
+    prefix = re.split(r"[*?\[]", pattern, maxsplit=1)[0]
+    if prefix == pattern:
+        position = bisect.bisect_left(test_names, pattern)
+        found = position < len(test_names) and test_names[position] == pattern
+        return [pattern] if found else []
+
+    start = bisect.bisect_left(test_names, prefix)
+    end = bisect.bisect_left(test_names, prefix + "\U0010ffff")
+    return [
+        name for name in test_names[start:end] if fnmatch.fnmatch(name, pattern)
+    ]
+
+
+def find_matching_test(pattern: str, index: dict) -> tuple[str, str]:
+    tests: dict[str, str] = {name: test["folder"] for name, test in index["tests"].items()}
+    matches = match_tests(list(tests), pattern)
 
     if len(matches) > 1:
         print(f"Found {len(matches)} matching tests:")
@@ -47,21 +141,14 @@ def find_matching_test(pattern: str) -> tuple[str, str]:
         return (matches[0], tests[matches[0]])
 
 
-def find_state_file(test_name: str) -> str:
-    # Assume that the testbench name is the second dot-separated member of the test name
-    testbench_name = test_name.split(".")[1].rstrip("_tb")
-
-    # Attempt to find a directory with the same name as the testbench recursively within TESTBENCH_DIRECTORY
-    for entity in Path(TESTBENCH_DIRECTORY).rglob("*"):
-        if entity.is_dir() and entity.name == testbench_name:
-            testbench_directory = entity
-            break
-    else:
+def find_state_file(test_name: str, index: dict) -> str:
+    test = index["tests"][test_name]
+    if not test["testbench_found"]:
         print("No testbench directory found. Skipping search for state file...")
         return ""
 
-    # Attempt to find a *surfer.ron state file in the testbench directory
-    state_files = list(testbench_directory.glob("*surf.ron"))
+    # Candidate *surf.ron state files found in the testbench directory when building the index
+    state_files = [path for path in test["state_files"] if Path(path).exists()]
 
     if len(state_files) == 0:
         print("No state files found. Proceeding...")
@@ -84,23 +171,21 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         "pattern",
-        type=Path,
+        type=str,
         help="Glob pattern for the test to open in Surfer.",
     )
     args = parser.parse_args()
     pattern: str = args.pattern
 
-    test_name, test_path = find_matching_test(pattern)
-    state_file = find_state_file(test_name)
-
-    for extension in WAVE_FILE_EXTENSIONS:
-        wave_file = (
-            Path(TEST_OUTPUT_DIRECTORY) / test_path / "ghdl" / f"wave{extension}"
-        )
-        if wave_file.exists():
-            break
+    index = load_index()
+    test_name, test_path = find_matching_test(pattern, index)
+    state_file = find_state_file(test_name, index)
 
-    if not wave_file.exists():
+    # Wave file might have been created after the index was built, look for it again if needed
+    wave_file = index["tests"][test_name]["wave_file"]
+    if not wave_file or not Path(wave_file).exists():
+        wave_file = find_wave_file(test_path)
+    if not wave_file:
         print("No wave file found.")
         sys.exit(1)
 
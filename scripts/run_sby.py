@@ -1,43 +1,552 @@
+import os
+import re
 import sys
+import json
+import time
+import hashlib
+import signal
 import subprocess
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+from helpers.impact_analysis import analyze_impact, get_changed_files
+from helpers.parse_sby import (
+    get_sby_files,
+    get_sby_tasks,
+    get_task_option,
+    read_sby_sections,
+    replace_sby_sections,
+    resolve_sby_path,
+    set_task_option,
+)
+
 # The following paths need to be set manually
 SBY_PATH = "D:/Programy/oss-cad-suite/bin/sby.exe"
+SBY_OUTPUT_DIRECTORY = Path("simulation/sby")
+SBY_CACHE_PATH = SBY_OUTPUT_DIRECTORY / "cache.json"
+SBY_ENGINES_PATH = SBY_OUTPUT_DIRECTORY / "engines.json"
+
+# Engines raced against each other with `--portfolio` (unless given by `--engines`), per task mode
+PORTFOLIO_ENGINES = {
+    "bmc": ["smtbmc z3", "smtbmc yices", "smtbmc boolector", "abc bmc3"],
+    "prove": ["smtbmc z3", "smtbmc yices", "abc pdr"],
+    "cover": ["smtbmc z3", "smtbmc yices", "smtbmc boolector"],
+}
+# SymbiYosys exit codes of PASS and FAIL, other codes (UNKNOWN, TIMEOUT, ERROR) are inconclusive
+CONCLUSIVE_RETURN_CODES = (0, 2)
+
+COVER_REACHED_PATTERN = re.compile(
+    r"Reached cover statement at (?P<name>.+?) in step (?P<step>\d+)"
+)
+COVER_UNREACHED_PATTERN = re.compile(r"Unreached cover statement at (?P<name>.+?)\.?$")
+DEPTH_SUGGESTION_PREFIX = "# run_sby.py --find-depth:"
+
+
+def kill_process_tree(process: subprocess.Popen) -> None:
+    """Kills the process along with all of its children (SBY spawns Yosys and solver processes)."""
+
+    if sys.platform == "win32":
+        subprocess.run(
+            ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    process.wait()
 
 
-def run_command(command, cwd=None):
+def run_command(command, cwd=None, timeout=None, log_file=None) -> int | None:
+    """Runs the command and returns its exit code, or `None` if it was killed after `timeout` seconds.
+    If `log_file` is given, the output of the command is written to it instead of the console."""
+
     print(f"Running command: {' '.join(command)}")
-    result = subprocess.run(
-        command,
-        text=True,
-        cwd=cwd,
-        stdout=sys.stdout,
-        stderr=sys.stderr,
-    )
-    return result.returncode
+    log = open(log_file, "w") if log_file else None
+    try:
+        process = subprocess.Popen(
+            command,
+            text=True,
+            cwd=cwd,
+            stdout=log or sys.stdout,
+            stderr=subprocess.STDOUT if log else sys.stderr,
+            start_new_session=sys.platform != "win32",
+        )
+        try:
+            return process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            kill_process_tree(process)
+            return None
+        except BaseException:
+            # The process runs in its own session, so Ctrl-C does not reach it
+            kill_process_tree(process)
+            raise
+    finally:
+        if log:
+            log.close()
+
+
+def run_sby_task(
+    sby_file: Path, task: str = "", timeout: float | None = None, quiet: bool = False
+) -> int | None:
+    """Runs a single task of the .sby file (or all of its tasks if `task` is empty) and returns
+    the SymbiYosys exit code, or `None` if the task timed out."""
 
+    SBY_OUTPUT_DIRECTORY.mkdir(parents=True, exist_ok=True)
 
-def run_sby_file(sby_file: Path, task: str = "") -> bool:
+    # Each .sby file gets its own prefix, so that parallel runs do not share working directories
+    prefix = SBY_OUTPUT_DIRECTORY / sby_file.stem
     command = [
         SBY_PATH,
         "--prefix",
-        "simulation/sby",
+        prefix.as_posix(),
         "-f",
         str(sby_file).replace("\\", "/"),
     ]
     if task:
         command.append(task)
 
-    returncode = run_command(command)
-    return returncode == 0
+    log_file = None
+    if quiet:
+        log_file = Path(f"{prefix}_{task}.log" if task else f"{prefix}.log")
+    returncode = run_command(command, timeout=timeout, log_file=log_file)
+    if returncode is None:
+        print(f"Timeout: {sby_file} {task} exceeded {timeout} s and was killed.")
+    return returncode
+
+
+def get_engine_name(engine: str) -> str:
+    return re.sub(r"\W+", "_", engine).strip("_")
+
+
+def write_sby_variant(
+    sby_file: Path, name: str, replacements: dict[str, list[str]], directory: Path
+) -> Path:
+    """Writes a copy of the .sby file with the lines of the given sections replaced into
+    `directory / name.sby`. The paths in its `[files]` section are made absolute, so that
+    they do not depend on the location of the copy."""
+
+    files = []
+    for line in read_sby_sections(sby_file).get("files", []):
+        parts = line.split()
+        parts[-1] = resolve_sby_path(sby_file, parts[-1]).resolve().as_posix()
+        files.append(" ".join(parts))
+
+    variant_file = directory / f"{name}.sby"
+    variant_file.parent.mkdir(parents=True, exist_ok=True)
+    content = replace_sby_sections(
+        sby_file.read_text(encoding="utf-8"), {"files": files, **replacements}
+    )
+    variant_file.write_text(content, encoding="utf-8")
+    return variant_file
+
+
+def write_engine_variant(sby_file: Path, task: str, engine: str) -> Path:
+    """Writes a copy of the .sby file which uses only the given engine (one per task, as tasks
+    of the same file may run in parallel)."""
+
+    name = "_".join(filter(None, [sby_file.stem, task, get_engine_name(engine)]))
+    return write_sby_variant(
+        sby_file, name, {"engines": [engine]}, SBY_OUTPUT_DIRECTORY / "portfolio"
+    )
+
+
+def get_portfolio_engines(sby_file: Path, task: str, engines: list[str] | None) -> list[str]:
+    """Returns the engines to race for the task: `engines` if given, the default ones for the
+    task mode (see `PORTFOLIO_ENGINES`) otherwise."""
+
+    if engines:
+        return engines
+    mode = get_task_option(sby_file, task, "mode") or task
+    return PORTFOLIO_ENGINES.get(mode, PORTFOLIO_ENGINES["bmc"])
+
+
+def race_sby_task(
+    sby_file: Path, task: str, engines: list[str], timeout: float | None = None
+) -> tuple[int | None, str | None]:
+    """Runs the task with each of the engines concurrently. As soon as one of them reaches
+    a conclusive result (PASS or FAIL), the others are killed. Returns the exit code of the
+    winning engine and its name. If no engine is conclusive, the exit code of the last
+    finished one is returned, or `None` if the task timed out."""
+
+    SBY_OUTPUT_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    processes = {}
+    for engine in engines:
+        variant_file = write_engine_variant(sby_file, task, engine)
+        prefix = SBY_OUTPUT_DIRECTORY / f"{sby_file.stem}_{get_engine_name(engine)}"
+        command = [SBY_PATH, "--prefix", prefix.as_posix(), "-f", variant_file.as_posix()]
+        if task:
+            command.append(task)
+        print(f"Running command: {' '.join(command)}")
+        log = open(f"{prefix}_{task}.log" if task else f"{prefix}.log", "w")
+        process = subprocess.Popen(
+            command,
+            text=True,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=sys.platform != "win32",
+        )
+        processes[engine] = (process, log)
+
+    deadline = time.monotonic() + timeout if timeout else None
+    returncode, winner = None, None
+    try:
+        while processes and winner is None:
+            for engine, (process, log) in list(processes.items()):
+                code = process.poll()
+                if code is None:
+                    continue
+                log.close()
+                del processes[engine]
+                returncode = code
+                if code in CONCLUSIVE_RETURN_CODES:
+                    winner = engine
+                    break
+            if deadline and time.monotonic() > deadline:
+                if winner is None:
+                    print(f"Timeout: {sby_file} {task} exceeded {timeout} s and was killed.")
+                    returncode = None
+                break
+            time.sleep(0.1)
+    finally:
+        for process, log in processes.values():
+            kill_process_tree(process)
+            log.close()
+    return returncode, winner
+
+
+def load_engine_records(engines_path: Path = SBY_ENGINES_PATH) -> dict[str, dict]:
+    if not engines_path.exists():
+        return {}
+    try:
+        with open(engines_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_engine_records(
+    records: dict[str, dict], engines_path: Path = SBY_ENGINES_PATH
+) -> None:
+    engines_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(engines_path, "w", encoding="utf-8") as file:
+        json.dump(records, file, indent=2)
+
+
+def get_sby_version() -> str:
+    """Returns the version string reported by SymbiYosys, which is part of the cache key."""
+
+    try:
+        result = subprocess.run(
+            [SBY_PATH, "--version"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return result.stdout.strip()
+
+
+def hash_sby_inputs(sby_file: Path, tool_version: str) -> str:
+    """Hashes the .sby file, every file in its `[files]` section and the tool version.
+    Missing files are hashed by name only, so that they are picked up once they appear."""
+
+    sha = hashlib.sha256(tool_version.encode())
+    for path in [sby_file] + get_sby_files(sby_file):
+        sha.update(path.as_posix().encode())
+        if path.exists():
+            sha.update(path.read_bytes())
+    return sha.hexdigest()
+
+
+def load_cache(cache_path: Path = SBY_CACHE_PATH) -> dict[str, dict]:
+    if not cache_path.exists():
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        print(f"WARNING: {cache_path} could not be read, ignoring it...")
+        return {}
+
+
+def save_cache(cache: dict[str, dict], cache_path: Path = SBY_CACHE_PATH) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as file:
+        json.dump(cache, file, indent=2)
 
 
 def find_all_sby_files(root: Path = Path("testbench")):
     return list(root.glob("**/*.sby"))
 
 
+def list_sby_jobs(sby_files: list[Path], task: str = "") -> list[tuple[Path, str]]:
+    """Splits the .sby files into (sby file, task) pairs, which can be run independently."""
+
+    jobs = []
+    for sby_file in sby_files:
+        tasks = [task] if task else get_sby_tasks(sby_file)
+        if not tasks:
+            tasks = [""]  # .sby file without tasks is run as a whole
+        jobs.extend((sby_file, sby_task) for sby_task in tasks)
+    return jobs
+
+
+def run_sby_jobs(
+    jobs: list[tuple[Path, str]],
+    max_workers: int = 1,
+    timeout: float | None = None,
+    use_cache: bool = True,
+    portfolio: bool = False,
+    engines: list[str] | None = None,
+    portfolio_size: int | None = None,
+) -> dict[str, bool]:
+    """Runs the (sby file, task) pairs on a pool of `max_workers` workers and prints the result
+    of each job as soon as it finishes. Returns a dictionary of .sby file to pass/fail status,
+    where a .sby file passes only if all of its tasks pass.
+
+    If `use_cache` is set, jobs whose inputs (see `hash_sby_inputs`) did not change since their
+    last run are skipped and their previous result is reported instead. The results of all
+    finished jobs are stored in the cache either way.
+
+    With `portfolio`, each job races several engines (see `race_sby_task`). The engine which
+    won is recorded per job and is put first in later runs, so that with `portfolio_size`
+    only the historically fastest engines are launched."""
+
+    results: dict[str, bool] = {str(sby_file): True for sby_file, _ in jobs}
+    quiet = max_workers > 1  # Parallel jobs would interleave their output, log it to files instead
+    cache = load_cache()
+    engine_records = load_engine_records()
+    tool_version = get_sby_version()
+
+    def report(sby_file: Path, task: str, passed: bool, note: str) -> None:
+        results[str(sby_file)] = results[str(sby_file)] and passed
+        icon = "✅" if passed else "❌"
+        task_name = f" [{task}]" if task else ""
+        print(f"{icon} {sby_file}{task_name} ({note})")
+
+    def run_job(sby_file: Path, task: str) -> tuple[int | None, float, str | None]:
+        start = time.perf_counter()
+        if not portfolio:
+            returncode = run_sby_task(sby_file, task, timeout, quiet)
+            return returncode, time.perf_counter() - start, None
+
+        job_engines = get_portfolio_engines(sby_file, task, engines)
+        record = engine_records.get(f"{sby_file.as_posix()}:{task}")
+        if record and record["engine"] in job_engines:
+            job_engines.remove(record["engine"])
+            job_engines.insert(0, record["engine"])
+        job_engines = job_engines[:portfolio_size]
+        returncode, winner = race_sby_task(sby_file, task, job_engines, timeout)
+        return returncode, time.perf_counter() - start, winner
+
+    pending_jobs = []
+    input_hashes: dict[tuple[Path, str], str] = {}
+    for sby_file, task in jobs:
+        input_hash = hash_sby_inputs(sby_file, tool_version)
+        input_hashes[(sby_file, task)] = input_hash
+        entry = cache.get(f"{sby_file.as_posix()}:{task}")
+        if use_cache and entry and entry["hash"] == input_hash:
+            report(sby_file, task, entry["passed"], "cached")
+        else:
+            pending_jobs.append((sby_file, task))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(run_job, sby_file, task): (sby_file, task)
+            for sby_file, task in pending_jobs
+        }
+
+        for future in as_completed(futures):
+            sby_file, task = futures[future]
+            returncode, elapsed, winner = future.result()
+            note = f"{elapsed:.1f} s, {winner}" if winner else f"{elapsed:.1f} s"
+            report(sby_file, task, returncode == 0, note)
+
+            if winner:
+                engine_records[f"{sby_file.as_posix()}:{task}"] = {
+                    "engine": winner,
+                    "elapsed": round(elapsed, 3),
+                }
+                save_engine_records(engine_records)
+
+            # Only PASS and FAIL say something about the design, inconclusive results (timeout,
+            # UNKNOWN, ERROR, no engine of the portfolio concluding) are run again next time
+            key = f"{sby_file.as_posix()}:{task}"
+            if returncode in CONCLUSIVE_RETURN_CODES:
+                cache[key] = {"hash": input_hashes[(sby_file, task)], "passed": returncode == 0}
+                save_cache(cache)
+            elif cache.pop(key, None) is not None:
+                save_cache(cache)
+
+    return results
+
+
+def describe_returncode(returncode: int | None) -> str:
+    names = {0: "PASS", 2: "FAIL", 4: "UNKNOWN", 8: "TIMEOUT", 16: "ERROR"}
+    return "killed (timeout)" if returncode is None else names.get(returncode, str(returncode))
+
+
+def run_with_depth(
+    sby_file: Path, task: str, depth: int, timeout: float | None = None
+) -> int | None:
+    """Runs the task on a copy of the .sby file with the `depth` option of the task set to
+    `depth`, returns the SymbiYosys exit code (`None` on timeout)."""
+
+    options = read_sby_sections(sby_file).get("options", [])
+    variant_file = write_sby_variant(
+        sby_file,
+        f"{sby_file.stem}_{task}_depth{depth}",
+        {"options": set_task_option(options, task, "depth", str(depth))},
+        SBY_OUTPUT_DIRECTORY / "depth",
+    )
+    return run_sby_task(variant_file, task, timeout, quiet=True)
+
+
+def find_minimal_depth(
+    sby_file: Path,
+    task: str = "prove",
+    max_depth: int = 64,
+    max_workers: int = 1,
+    timeout: float | None = None,
+) -> int | None:
+    """Returns the minimal depth for which the (k-induction) task passes, or `None` if it
+    does not pass up to `max_depth`, a counterexample was found or SymbiYosys failed. The depth is searched
+    exponentially (1, 2, 4, ...) first and then by narrowing down the interval between the
+    deepest failing and the shallowest passing depth. Each round runs up to `max_workers`
+    depths in parallel: consecutive powers of two in the first phase and evenly spaced
+    depths within the interval in the second one."""
+
+    def run_depths(depths: list[int]) -> dict[int, int | None]:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            returncodes = executor.map(
+                lambda depth: run_with_depth(sby_file, task, depth, timeout), depths
+            )
+            results = dict(zip(depths, returncodes))
+        for depth, returncode in sorted(results.items()):
+            print(f"  {sby_file.stem} [{task}] depth {depth}: {describe_returncode(returncode)}")
+        return results
+
+    failing, passing = 0, None
+    depth = 1
+    while passing is None:
+        depths = sorted({min(depth * 2**i, max_depth) for i in range(max_workers)})
+        results = run_depths(depths)
+        if 2 in results.values():
+            print(f"❌ {sby_file} [{task}]: counterexample found, the design needs fixing first.")
+            return None
+        if 16 in results.values():
+            print(f"❌ {sby_file} [{task}]: SymbiYosys failed, see the logs in {SBY_OUTPUT_DIRECTORY}.")
+            return None
+        passing = min((d for d, code in results.items() if code == 0), default=None)
+        failing = max([d for d in depths if passing is None or d < passing] + [failing])
+        if passing is None:
+            if depths[-1] >= max_depth:
+                return None
+            depth = depths[-1] * 2
+
+    while passing - failing > 1:
+        count = min(max_workers, passing - failing - 1)
+        depths = sorted(
+            {failing + (passing - failing) * (i + 1) // (count + 1) for i in range(count)}
+        )
+        depths = [d for d in depths if failing < d < passing]
+        results = run_depths(depths)
+        passing = min([d for d, code in results.items() if code == 0] + [passing])
+        failing = max([d for d, code in results.items() if d < passing and code != 0] + [failing])
+
+    return passing
+
+
+def find_cover_steps(
+    sby_file: Path, task: str = "cover", timeout: float | None = None
+) -> dict[str, int | None]:
+    """Runs the cover task and returns the step in which each cover statement was reached
+    first (`None` if it was not reached), parsed from the SymbiYosys log."""
+
+    run_sby_task(sby_file, task, timeout, quiet=True)
+    log_file = SBY_OUTPUT_DIRECTORY / f"{sby_file.stem}_{task}" / "logfile.txt"
+    steps: dict[str, int | None] = {}
+    if not log_file.exists():
+        return steps
+    for line in log_file.read_text(encoding="utf-8", errors="replace").splitlines():
+        match = COVER_REACHED_PATTERN.search(line)
+        if match:
+            name = match.group("name")
+            step = int(match.group("step"))
+            if steps.get(name) is None or step < steps[name]:
+                steps[name] = step
+            continue
+        match = COVER_UNREACHED_PATTERN.search(line)
+        if match:
+            steps.setdefault(match.group("name"), None)
+    return steps
+
+
+def write_depth_suggestion(sby_file: Path, suggestions: dict[str, int]) -> None:
+    """Writes the found depths (task name to depth) into the `[options]` section of the .sby
+    file as a comment, replacing the previous suggestion. The options themselves are kept, the
+    section is added if the file has none."""
+
+    suggestion = DEPTH_SUGGESTION_PREFIX + "".join(
+        f" {task}: depth {depth};" for task, depth in suggestions.items()
+    ).rstrip(";")
+    lines = [
+        line
+        for line in sby_file.read_text(encoding="utf-8").splitlines()
+        if not line.startswith(DEPTH_SUGGESTION_PREFIX)
+    ]
+    index = next((i for i, line in enumerate(lines) if line.strip() == "[options]"), None)
+    if index is None:
+        lines += ["", "[options]", suggestion]
+    else:
+        lines.insert(index + 1, suggestion)
+    sby_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def find_depths(
+    sby_file: Path,
+    task: str = "",
+    max_depth: int = 64,
+    max_workers: int = 1,
+    timeout: float | None = None,
+    write: bool = False,
+) -> dict[str, int | None]:
+    """Finds the minimal depth of each `prove` task and the depth needed to reach all covers of
+    each `cover` task of the .sby file, optionally writing them into it as a suggestion. Tasks
+    without a depth (no passing depth, unreached covers or errors) are mapped to `None`."""
+
+    suggestions = {}
+    for task in [task] if task else get_sby_tasks(sby_file) or [""]:
+        mode = get_task_option(sby_file, task, "mode") or task
+        if mode == "prove":
+            suggestions[task] = find_minimal_depth(sby_file, task, max_depth, max_workers, timeout)
+            if suggestions[task] is None:
+                print(f"❌ {sby_file} [{task}]: no passing depth up to {max_depth}")
+            else:
+                print(f"✅ {sby_file} [{task}]: minimal depth {suggestions[task]}")
+        elif mode == "cover":
+            steps = find_cover_steps(sby_file, task, timeout)
+            for name, step in steps.items():
+                reached = f"step {step}" if step is not None else "unreached"
+                print(f"  {sby_file.stem} [{task}] {name}: {reached}")
+            reached_steps = [step for step in steps.values() if step is not None]
+            if reached_steps and len(reached_steps) == len(steps):
+                # Covers reached in step N need a depth of at least N + 1
+                suggestions[task] = max(reached_steps) + 1
+                print(f"✅ {sby_file} [{task}]: all covers reached by depth {suggestions[task]}")
+            else:
+                suggestions[task] = None
+                print(f"❌ {sby_file} [{task}]: not all covers reached")
+
+    found = {task: depth for task, depth in suggestions.items() if depth is not None}
+    if write and found:
+        write_depth_suggestion(sby_file, found)
+        print(f"Depth suggestion written into {sby_file}")
+    return suggestions
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run SymbiYosys testbenches.")
     parser.add_argument(
@@ -49,7 +558,75 @@ if __name__ == "__main__":
     parser.add_argument(
         "task", type=str, nargs="?", default="", help="Optional task name to run."
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of (sby file, task) pairs to run in parallel.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Timeout in seconds for a single task, after which the task is killed and fails.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run all tasks, even those whose inputs did not change since their last run.",
+    )
+    parser.add_argument(
+        "--portfolio",
+        action="store_true",
+        help="Race several engines for each task and take the first conclusive result.",
+    )
+    parser.add_argument(
+        "--engines",
+        type=str,
+        nargs="+",
+        default=None,
+        help='Engines to race with --portfolio (e.g. "smtbmc z3" "abc pdr"), '
+        "by default depends on the task mode.",
+    )
+    parser.add_argument(
+        "--portfolio-size",
+        type=int,
+        default=None,
+        help="Number of engines launched per task with --portfolio, the engine which "
+        "won the previous run first (default: all).",
+    )
+    parser.add_argument(
+        "--find-depth",
+        action="store_true",
+        help="Find the minimal depth of the prove tasks and the steps in which the covers "
+        "are reached, instead of running the tasks.",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=64,
+        help="Maximum depth tried by --find-depth.",
+    )
+    parser.add_argument(
+        "--write-depth",
+        action="store_true",
+        help="Write the depths found by --find-depth into the .sby files as a comment.",
+    )
+    parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        metavar="REVISION",
+        help="Without a directory, run only the .sby files affected by the files changed "
+        "since the git revision.",
+    )
     args = parser.parse_args()
+    portfolio_options = {
+        "portfolio": args.portfolio or bool(args.engines),
+        "engines": args.engines,
+        "portfolio_size": args.portfolio_size,
+    }
 
     if args.directory:
         sby_file = args.directory / f"{args.directory.name}.sby"
@@ -57,23 +634,50 @@ if __name__ == "__main__":
             print(f"Error: {sby_file} does not exist.")
             sys.exit(1)
 
-        success = run_sby_file(sby_file, args.task)
-        sys.exit(0 if success else 1)
+    if args.find_depth:
+        found_all = True
+        for sby_file in [sby_file] if args.directory else find_all_sby_files():
+            depths = find_depths(
+                sby_file,
+                args.task,
+                args.max_depth,
+                args.jobs,
+                args.timeout,
+                args.write_depth,
+            )
+            found_all = found_all and None not in depths.values()
+        sys.exit(0 if found_all else 1)
+
+    if args.directory:
+        results = run_sby_jobs(
+            list_sby_jobs([sby_file], args.task),
+            args.jobs,
+            args.timeout,
+            use_cache=not args.force,
+            **portfolio_options,
+        )
+        sys.exit(0 if all(results.values()) else 1)
 
     # No directory provided — run all found testbenches
     all_sby_files = find_all_sby_files()
     if not all_sby_files:
         print("No .sby files found in testbench/**/")
         sys.exit(1)
+    if args.since:
+        affected = analyze_impact(get_changed_files(args.since)).sby_files
+        all_sby_files = [sby_file for sby_file in all_sby_files if sby_file in affected]
+        if not all_sby_files:
+            print(f"No .sby files affected by the changes since {args.since}.")
+            sys.exit(0)
 
-    print(f"Found {len(all_sby_files)} .sby testbenches. Running all...\n")
+    jobs = list_sby_jobs(all_sby_files, args.task)
+    print(
+        f"Found {len(all_sby_files)} .sby testbenches ({len(jobs)} tasks). Running all with {args.jobs} job(s)...\n"
+    )
 
-    results = {}
-    for sby in all_sby_files:
-        print(f"Running testbench: {sby}")
-        success = run_sby_file(sby, args.task)
-        results[str(sby)] = success
-        print("-" * 60)
+    results = run_sby_jobs(
+        jobs, args.jobs, args.timeout, use_cache=not args.force, **portfolio_options
+    )
 
     print("\nFormal verification summary:")
     for sby, passed in results.items():
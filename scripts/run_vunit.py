@@ -1,19 +1,31 @@
+import os
 import sys
-from vunit import VUnit
+import subprocess
+from vunit import VUnit, VUnitCLI
 from pathlib import Path
-import importlib
-import importlib.util
 
-
-def find_file(root: Path, target_name: str) -> Path | None:
-    for child in root.iterdir():
-        if child.name == target_name:
-            return child
-        if child.is_dir():
-            result = find_file(child, target_name)
-            if result:
-                return result
-    return None
+from helpers.covering_array import FULL_SWEEP_VARIABLE
+from helpers.ghdl_elaboration import enable_elaboration_reuse
+from helpers.impact_analysis import analyze_impact, get_changed_files
+from helpers.test_cache import (
+    get_simulator_version,
+    get_test_key,
+    hash_files,
+    load_test_cache,
+    split_cached_suites,
+    update_test_cache,
+)
+from helpers.testbench_index import load_config_module, load_testbench_index
+from helpers.wave_selection import get_wave_signals, write_wave_option_file
+from helpers.test_history import (
+    finish_shard,
+    load_shard_history,
+    load_test_history,
+    parse_shard,
+    schedule_test_suites,
+    select_shard,
+    update_test_history,
+)
 
 
 # Define default arguments
@@ -30,7 +42,69 @@ default_args = [
 # Append actual command-line arguments, excluding the script name
 sys.argv = default_args + sys.argv[1:]
 
-vunit = VUnit.from_argv()
+cli = VUnitCLI()
+cli.parser.add_argument(
+    "--shard",
+    type=parse_shard,
+    default=None,
+    help="Run only the i-th of N partitions of the tests (i/N) of about the same runtime. "
+    "Each shard writes into its own output directory.",
+)
+cli.parser.add_argument(
+    "--full-sweep",
+    action="store_true",
+    help="Configure the testbenches with the full cross product of the generic values "
+    "instead of their covering arrays (see helpers/covering_array.py).",
+)
+cli.parser.add_argument(
+    "--elaborate-per-config",
+    action="store_true",
+    help="Elaborate each configuration separately instead of reusing one executable "
+    "per testbench.",
+)
+cli.parser.add_argument(
+    "--all-signals",
+    action="store_true",
+    help="Dump all signals into the wave files, not only the ones displayed in the "
+    "Surfer state files of the testbench.",
+)
+cli.parser.add_argument(
+    "--waves-on-failure",
+    action="store_true",
+    help="Run the tests without dumping wave files, then run the failed tests again "
+    "with wave files.",
+)
+cli.parser.add_argument(
+    "--no-cache",
+    action="store_true",
+    help="Run all tests, including the ones which passed before with the same inputs.",
+)
+cli.parser.add_argument(
+    "--since",
+    type=str,
+    default=None,
+    metavar="REVISION",
+    help="Run only the testbenches affected by the files changed since the git revision "
+    "(replaces the test patterns).",
+)
+args = cli.parse_args()
+if args.since:
+    impact = analyze_impact(get_changed_files(args.since))
+    if not impact.testbenches:
+        print(f"No testbenches affected by the changes since {args.since}.")
+        sys.exit(0)
+    args.test_patterns = [f"lib.{name}.*" for name in impact.testbenches]
+    print(f"Running the testbenches affected since {args.since}: {', '.join(impact.testbenches)}")
+if args.shard and Path(args.output_path) == Path(default_args[2]):
+    # Shards running at the same time must not share the VUnit output directory
+    args.output_path = f"{default_args[2]}_shard{args.shard[0]}of{args.shard[1]}"
+# The wave format of the tests run again by `--waves-on-failure`
+wave_format = args.viewer_fmt
+if args.waves_on_failure:
+    args.viewer_fmt = None
+if args.full_sweep:
+    os.environ[FULL_SWEEP_VARIABLE] = "1"
+vunit = VUnit.from_args(args=args)
 vunit.add_vhdl_builtins()
 
 lib = vunit.add_library("lib")
@@ -41,18 +115,22 @@ lib.add_source_files("testbench/**/*.vhd")
 # The following code is used to automatically configure the testbenches
 # based on the presence of a `vunit_config.py` file within the testbench
 # directory (which is named the same as the testbench itself, without the `_tb`).
+# The testbench directory is scanned once into an index (cached on disk until
+# any of its directories changes) and each `vunit_config.py` is imported once.
+testbench_index = load_testbench_index()
+config_modules = {}
+if not args.elaborate_per_config:
+    enable_elaboration_reuse(Path(args.output_path), testbench_index)
 for testbench in lib.get_test_benches():
-    testbench_path = find_file(Path("testbench"), testbench.name + ".vhd")
-    if testbench_path is None:
+    entry = testbench_index["files"].get(testbench.name)
+    if entry is None:
         print(
             f"Could not find testbench directory for testbench '{testbench.name}', skipping..."
         )
         continue
-    config_path = testbench_path.parent / "vunit_config.py"
-    if config_path.exists():
-        spec = importlib.util.spec_from_file_location("config", str(config_path))
-        config_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(config_module)
+    config_path = entry["config"]
+    if config_path:
+        config_module = load_config_module(Path(config_path), config_modules)
         config_module.configure(testbench)
         print(f"Configured '{testbench.name}' with '{config_path}'")
     else:
@@ -60,7 +138,96 @@ for testbench in lib.get_test_benches():
             f"Could not find vunit_config.py for testbench '{testbench.name}', skipping..."
         )
 
+    # Only the signals displayed in the Surfer state files are dumped into the wave file
+    if args.viewer_fmt and not args.all_signals:
+        wave_signals = get_wave_signals(Path(entry["path"]).parent)
+        if wave_signals:
+            wave_option_file = write_wave_option_file(testbench.name, wave_signals)
+            testbench.set_sim_option(
+                "ghdl.sim_flags",
+                [f"--read-wave-opt={wave_option_file.as_posix()}"],
+                overwrite=False,
+            )
+
 vunit.set_compile_option(
     "ghdl.a_flags", ["-fpsl", "--std=08"]
 )  # -fpsl is needed to accept PSL asserts in comments
-vunit.main()
+
+# Tests which failed last time run first, then the longest ones, based on the
+# wall times recorded in the previous runs. VUnit does not provide a public API
+# for ordering the tests, so the list created by VUnit is reordered in place.
+# Tests which passed before with the same dependencies, generics, simulation
+# options and simulator version are not run again, unless `--no-cache` is used.
+test_history = load_test_history()
+test_cache = load_test_cache()
+test_keys = {}
+dependency_hashes = {}
+create_tests = vunit._create_tests
+
+
+def get_dependency_hash(file_name: str) -> str:
+    if file_name not in dependency_hashes:
+        source_files = vunit.get_implementation_subset([vunit.get_source_file(file_name)])
+        dependency_hashes[file_name] = hash_files([Path(f.name) for f in source_files])
+    return dependency_hashes[file_name]
+
+
+def create_scheduled_tests(simulator_if):
+    test_list = create_tests(simulator_if)
+    test_suites = list(test_list)
+    # The shard is selected before the cached tests are removed and by the history snapshot
+    # of the sharded run, so that it does not depend on the results of the other shards
+    if args.shard is not None:
+        shard_history = load_shard_history(args.shard, register=simulator_if is not None)
+        test_suites = select_shard(test_suites, args.shard, shard_history)
+
+    if simulator_if is not None:
+        simulator_version = get_simulator_version(simulator_if)
+        for suite in test_suites:
+            dependency_hash = get_dependency_hash(suite.file_name)
+            for name, config in suite.test_configuration.items():
+                test_keys[name] = get_test_key(config, dependency_hash, simulator_version)
+        if not args.no_cache:
+            test_suites, cached_suites = split_cached_suites(
+                test_suites, test_cache, test_keys
+            )
+            for suite in cached_suites:
+                for name in suite.test_names:
+                    print(f"Cached pass: {name}")
+
+    test_list._test_suites = schedule_test_suites(test_suites, test_history)
+    return test_list
+
+
+failed_tests = []
+
+
+def save_results(results) -> None:
+    report = results.get_report()
+    update_test_history(report)
+    update_test_cache(report, test_keys)
+    if args.shard is not None:
+        finish_shard(args.shard)
+    failed_tests.extend(
+        name for name, result in report.tests.items() if result.status == "failed"
+    )
+
+
+def rerun_with_waves(test_names: list[str]) -> int:
+    """Runs the given tests again in a new VUnit run, with wave files dumped."""
+
+    print(f"Running {len(test_names)} failed test(s) again with wave files...")
+    command = [sys.executable, __file__, *test_names, "-p", str(args.num_threads)]
+    command += ["--viewer-fmt", wave_format]
+    command += ["--all-signals"] if args.all_signals else []
+    command += ["--elaborate-per-config"] if args.elaborate_per_config else []
+    return subprocess.run(command).returncode
+
+
+vunit._create_tests = create_scheduled_tests
+try:
+    vunit.main(post_run=save_results)
+except SystemExit as exit:
+    if args.waves_on_failure and failed_tests:
+        rerun_with_waves(failed_tests)
+    raise exit
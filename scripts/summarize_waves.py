@@ -0,0 +1,116 @@
+import sys
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from load_surfer import MAPPING_FILE_PATH, find_wave_file, load_index, match_tests
+from helpers.parse_waveform import (
+    WaveformSummary,
+    list_signals,
+    summarize_waveform,
+)
+
+
+def format_time(time: float) -> str:
+    for unit, scale in [("s", 1), ("ms", 1e-3), ("us", 1e-6), ("ns", 1e-9), ("ps", 1e-12)]:
+        if abs(time) >= scale:
+            return f"{time / scale:.6g} {unit}"
+    return f"{time / 1e-15:.6g} fs"
+
+
+def find_wave_files(pattern: str) -> list[Path]:
+    """Returns the wave file if `pattern` is a path, the wave files of the VUnit tests
+    matching the glob pattern otherwise (see `load_surfer.py`)."""
+
+    if Path(pattern).is_file():
+        return [Path(pattern)]
+    if not Path(MAPPING_FILE_PATH).exists():
+        print(f"{MAPPING_FILE_PATH} not found, run the VUnit tests first.")
+        return []
+
+    index = load_index()
+    wave_files = []
+    for test_name in match_tests(sorted(index["tests"]), pattern):
+        test = index["tests"][test_name]
+        wave_file = test["wave_file"] or find_wave_file(test["folder"])
+        if wave_file:
+            wave_files.append(Path(wave_file))
+        else:
+            print(f"No wave file found for test {test_name}")
+    return wave_files
+
+
+def print_report(summary: WaveformSummary, edges: int) -> None:
+    timescale = summary.timescale
+    duration = (summary.end_time - summary.start_time) * timescale
+    print(f"\n{summary.path} ({format_time(duration)}, {len(summary.signals)} signal(s))")
+
+    name_width = max((len(name) for name in summary.signals), default=0)
+    for name, signal in summary.signals.items():
+        line = f"  {name:<{name_width}}  toggles {signal.toggles:>8}"
+        if signal.signal.width == 1:
+            line += f"  duty {signal.duty_cycle * 100:6.2f} %"
+            line += f"  rising {len(signal.rising_edges):>8}  falling {len(signal.falling_edges):>8}"
+            if len(signal.rising_edges) > 1:
+                period = np.diff(signal.rising_edges).mean() * timescale
+                line += f"  period {format_time(period)}"
+        else:
+            line += f"  width {signal.signal.width}"
+        line += f"  final {signal.final_value}"
+        print(line)
+
+        if edges and len(signal.rising_edges):
+            times = ", ".join(format_time(t * timescale) for t in signal.rising_edges[:edges])
+            print(f"  {'':<{name_width}}  first rising edges: {times}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Print toggle counts, duty cycles and edges of signals in VUnit wave files without a waveform viewer. "
+        "Only VCD files can be read, run the tests with `run_vunit.py --viewer-fmt vcd` first "
+        "(the default format is GHW)."
+    )
+    parser.add_argument(
+        "pattern",
+        type=str,
+        help="VCD file, or glob pattern of the tests whose wave files to summarize (the tests "
+        "must have been run with --viewer-fmt vcd).",
+    )
+    parser.add_argument(
+        "-s",
+        "--signal",
+        type=str,
+        action="append",
+        help="Glob pattern of the signals to summarize, matched against the full or the "
+        "unscoped signal name (repeatable, default: all signals).",
+    )
+    parser.add_argument(
+        "--edges",
+        type=int,
+        default=0,
+        help="Print the timestamps of the first N rising edges of each signal.",
+    )
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="Only list the signals declared in the wave files.",
+    )
+    args = parser.parse_args()
+
+    wave_files = find_wave_files(args.pattern)
+    if not wave_files:
+        print("No wave files found.")
+        sys.exit(1)
+
+    for wave_file in wave_files:
+        try:
+            if args.list:
+                print(f"\n{wave_file}")
+                for signal in list_signals(wave_file):
+                    print(f"  {signal.name} [{signal.width}]")
+            else:
+                print_report(summarize_waveform(wave_file, args.signal), args.edges)
+        except ValueError as error:
+            print(f"{wave_file}: {error}")
+            sys.exit(1)
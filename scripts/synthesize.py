@@ -1,20 +1,48 @@
+import os
 import sys
+import csv
+import time
 import argparse
+import tempfile
 import subprocess
+from itertools import product
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from helpers.add_svg_white_background import add_white_background
+from helpers.ghdl_library import GHDL_LIBRARY_DIRECTORY, update_library
+from helpers.netlist_analysis import (
+    analyze_netlist,
+    get_netlist_metrics,
+    load_netlist,
+    save_netlist,
+)
+from helpers.netlist_hierarchy import render_hierarchy
+from helpers.parse_vhdl import get_dependency_closure, load_design_units
+from helpers.synthesis_metrics import TRACKED_METRICS, format_generics, record_metrics
 
 # The following paths need to be set manually
 YOSYS_PATH = "D:/Programy/MSYS2/mingw64/bin/yosys.exe"
+GHDL_PATH = "D:/Programy/MSYS2/mingw64/bin/ghdl.exe"  # must match GHDL used by the Yosys plugin
 NETLISTSVG_PATH = "C:/Users/jfran/AppData/Roaming/npm/netlistsvg.cmd"
 NETLISTSVG_SKIN_PATH = "scripts/netlistsvg_skins/default.svg"
 
+SOURCE_DIRECTORY = Path("source")
+SYNTHESIS_OUTPUT_DIRECTORY = Path("simulation/synthesis")
+# Synthesis commands which flatten the design unless `-noflatten` is given (the others, like
+# `prep`, only flatten it with `-flatten`)
+FLATTENING_COMMANDS = frozenset(
+    ["synth", "synth_xilinx", "synth_ice40", "synth_ecp5", "synth_gowin", "synth_nexus"]
+)
 
-def run_command(command, cwd=None):
-    try:
-        print(f"Running command: {' '.join(command)}")
-        result = subprocess.run(
+
+def run_command(command, cwd=None, log_file=None):
+    """Runs the command and raises `subprocess.CalledProcessError` if it fails.
+    If `log_file` is given, the output of the command is appended to it instead of the console."""
+
+    print(f"Running command: {' '.join(command)}")
+    if log_file is None:
+        subprocess.run(
             command,
             check=True,
             text=True,
@@ -22,14 +50,270 @@ def run_command(command, cwd=None):
             stdout=sys.stdout,
             stderr=sys.stderr,
         )
-        result.check_returncode()  # This raises CalledProcessError if returncode is non-zero
-    except subprocess.CalledProcessError as e:
-        print(f"Error: {e}")
-        print(f"Command: {' '.join(command)}")
-        print(f"Exit code: {e.returncode}")
-        print(f"Standard Output:\n{e.stdout}")
-        print(f"Standard Error:\n{e.stderr}")
-        sys.exit(e.returncode)
+        return
+
+    with open(log_file, "a") as log:
+        log.write(f"Running command: {' '.join(command)}\n")
+        log.flush()
+        subprocess.run(
+            command,
+            check=True,
+            text=True,
+            cwd=cwd,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+
+
+def get_hierarchical_command(synthesis_command: str) -> str:
+    """Returns the synthesis command with flattening turned off, so that the netlist keeps a
+    module per entity for `--hierarchical`."""
+
+    arguments = [argument for argument in synthesis_command.split() if argument != "-flatten"]
+    if arguments and arguments[0] in FLATTENING_COMMANDS and "-noflatten" not in arguments:
+        arguments.append("-noflatten")
+    return " ".join(arguments)
+
+
+def find_all_entity_directories(root: Path = SOURCE_DIRECTORY) -> list[Path]:
+    """Returns all directories which contain a VHDL file with the same name as the directory."""
+
+    return sorted(
+        directory
+        for directory in root.rglob("*")
+        if directory.is_dir() and (directory / f"{directory.name}.vhd").exists()
+    )
+
+
+def synthesize(
+    directory: Path,
+    synthesis_command: str,
+    generate_svg: bool,
+    work_directory: Path,
+    log_file: Path | None = None,
+    use_library: bool = False,
+    generics: dict[str, str] | None = None,
+    hierarchical: bool = False,
+    render_jobs: int | None = None,
+    units: dict[Path, tuple[set[str], set[str]]] | None = None,
+) -> tuple[Path | None, dict]:
+    """Synthesizes the entity in `directory` with Yosys and renders its netlist with netlistsvg.
+    The JSON netlist is written to `work_directory` and kept compressed in
+    `helpers.netlist_analysis.NETLIST_DIRECTORY`. Returns the path to the created SVG (if any)
+    and the synthesis metrics record.
+
+    If `hierarchical` is set, each module of the netlist is rendered into its own SVG in
+    `<entity>_netlist/` (see `helpers.netlist_hierarchy.render_hierarchy`) and the path to the
+    index of the modules is returned. The modules are rendered by `render_jobs` parallel
+    netlistsvg processes (one per CPU by default). Flattening is turned off in the synthesis
+    command (see `get_hierarchical_command`), which is recorded along with the metrics.
+
+    If `use_library` is set, the entity is elaborated from the pre-analysed GHDL library
+    (see `helpers.ghdl_library.update_library`) instead of analysing all VHDL files again.
+    Otherwise, the VHDL files the entity depends on are taken from `units` (see
+    `helpers.parse_vhdl.load_design_units`, loaded here if not given).
+    The output of the Yosys `stat` command is recorded by `helpers.synthesis_metrics`."""
+
+    generics = generics or {}
+    if hierarchical:
+        synthesis_command = get_hierarchical_command(synthesis_command)
+    vhd_file_path: Path = directory / (directory.name + ".vhd")
+    svg_file_path: Path = directory / (directory.name + "_netlist.svg")
+    json_file_path = work_directory / f"{vhd_file_path.stem}.json"
+    stat_file_path = work_directory / f"{vhd_file_path.stem}_stat.txt"
+    generic_options = "".join(f"-g{name}={value} " for name, value in generics.items())
+    if use_library:
+        ghdl_command = f"ghdl --std=08 --no-formal {generic_options}--workdir={GHDL_LIBRARY_DIRECTORY.as_posix()} --work=work -e {vhd_file_path.stem}"
+    else:
+        # Only the files the entity depends on are analysed (see `helpers.parse_vhdl`)
+        if units is None:
+            units = load_design_units(list(SOURCE_DIRECTORY.glob("**/*.vhd")))
+        vhd_file_paths = get_dependency_closure(units, {vhd_file_path.stem.lower()})
+        ghdl_command = f"ghdl --std=08 --no-formal {generic_options}--work=work {' '.join(str(path) for path in vhd_file_paths)} --work=work -e {vhd_file_path.stem}"
+    run_command(
+        [
+            YOSYS_PATH,
+            "-p",
+            ghdl_command,
+            "-p",
+            f"hierarchy -top {vhd_file_path.stem}",
+            "-p",
+            "proc",
+            "-p",
+            f"{synthesis_command} -top {vhd_file_path.stem}",
+            "-p",
+            f"write_json {json_file_path.as_posix()}",
+            "-p",
+            f"tee -o {stat_file_path.as_posix()} stat",
+        ],
+        log_file=log_file,
+    )
+
+    netlist_path = save_netlist(json_file_path, vhd_file_path.stem, generics)
+    netlist = load_netlist(json_file_path)
+    netlist_metrics = get_netlist_metrics(analyze_netlist(netlist))
+    with open(stat_file_path, "r", encoding="utf-8") as file:
+        record = record_metrics(
+            vhd_file_path.stem, generics, synthesis_command, file.read(), netlist_metrics
+        )
+    stat_file_path.unlink()
+    print(f"Saved: {netlist_path}")
+
+    if not generate_svg:
+        return None, record
+
+    def render(json_path: Path, svg_path: Path) -> None:
+        run_command(
+            [
+                NETLISTSVG_PATH,
+                json_path.as_posix(),
+                "-o",
+                svg_path.as_posix(),
+                "--skin",
+                NETLISTSVG_SKIN_PATH,
+            ],
+            log_file=log_file,
+        )
+
+    if hierarchical:
+        index_path = render_hierarchy(
+            netlist,
+            directory / f"{directory.name}_netlist",
+            Path(NETLISTSVG_SKIN_PATH),
+            render,
+            render_jobs,
+        )
+        print(f"Created: {index_path}")
+        return index_path, record
+
+    render(json_file_path, svg_file_path)
+    print(f"Created: {svg_file_path}")
+
+    add_white_background(svg_file_path, minify=True)
+    return svg_file_path, record
+
+
+def get_job_name(directory: Path, generics: dict[str, str]) -> str:
+    return f"{directory} ({format_generics(generics)})" if generics else str(directory)
+
+
+def synthesize_all(
+    jobs: list[tuple[Path, dict[str, str]]],
+    synthesis_command: str,
+    generate_svg: bool,
+    max_workers: int,
+    use_library: bool = False,
+    hierarchical: bool = False,
+) -> dict[str, tuple[bool, float, str, dict | None]]:
+    """Synthesizes the (entity directory, generics) pairs on a pool of `max_workers` workers.
+    Each worker gets its own temporary directory for the JSON netlist and writes its output
+    to a log file. Returns a dictionary of job name (see `get_job_name`) to
+    (success, elapsed time, output or log path, synthesis metrics record)."""
+
+    SYNTHESIS_OUTPUT_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    results: dict[str, tuple[bool, float, str, dict | None]] = {}
+    # The dependency graph is loaded (and its cache file updated) once, before the workers start
+    units = None if use_library else load_design_units(list(SOURCE_DIRECTORY.glob("**/*.vhd")))
+
+    def synthesize_job(
+        directory: Path, generics: dict[str, str]
+    ) -> tuple[bool, float, str, dict | None]:
+        suffix = f"_{format_generics(generics)}" if generics else ""
+        log_file = SYNTHESIS_OUTPUT_DIRECTORY / f"{directory.name}{suffix}.log"
+        log_file.unlink(missing_ok=True)
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix=f"synth_{directory.name}_") as work:
+            try:
+                svg_file_path, record = synthesize(
+                    directory,
+                    synthesis_command,
+                    generate_svg,
+                    Path(work),
+                    log_file,
+                    use_library,
+                    generics,
+                    hierarchical,
+                    # The jobs already run in parallel, so each one renders its modules serially
+                    render_jobs=1,
+                    units=units,
+                )
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"Error: {get_job_name(directory, generics)}: {e}")
+                return False, time.perf_counter() - start, log_file.as_posix(), None
+        output = svg_file_path.as_posix() if svg_file_path else log_file.as_posix()
+        return True, time.perf_counter() - start, output, record
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(synthesize_job, directory, generics): get_job_name(
+                directory, generics
+            )
+            for directory, generics in jobs
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            results[name] = future.result()
+            success, elapsed, _, _ = results[name]
+            print(f"{'✅' if success else '❌'} {name} ({elapsed:.1f} s)")
+
+    return {
+        get_job_name(directory, generics): results[get_job_name(directory, generics)]
+        for directory, generics in jobs
+    }
+
+
+def expand_generic_grid(
+    sweeps: list[str], fixed_generics: dict[str, str]
+) -> list[dict[str, str]]:
+    """Expands `NAME=VALUE1,VALUE2,...` sweep definitions into the cross product of all values,
+    each combined with the fixed generics."""
+
+    names = [sweep.split("=", 1)[0] for sweep in sweeps]
+    values = [sweep.split("=", 1)[1].split(",") for sweep in sweeps]
+    return [
+        {**fixed_generics, **dict(zip(names, point))} for point in product(*values)
+    ]
+
+
+def write_sweep_table(
+    directory: Path,
+    results: dict[str, tuple[bool, float, str, dict | None]],
+    generic_names: list[str],
+) -> Path:
+    """Writes a CSV table of synthesis metrics (tracked metrics and per-cell-type counts) versus
+    generic values for all successfully synthesized points of the entity's sweep."""
+
+    records = [
+        record
+        for _, _, _, record in results.values()
+        if record and record["entity"] == directory.name
+    ]
+    cell_types = sorted(
+        {cell for record in records for cell in record["metrics"]["cell_types"]}
+    )
+
+    table_path = SYNTHESIS_OUTPUT_DIRECTORY / f"sweep_{directory.name}.csv"
+    with open(table_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(generic_names + TRACKED_METRICS + cell_types)
+        for record in records:
+            metrics = record["metrics"]
+            writer.writerow(
+                [record["generics"].get(name, "") for name in generic_names]
+                + [metrics.get(metric, 0) for metric in TRACKED_METRICS]
+                + [metrics["cell_types"].get(cell, 0) for cell in cell_types]
+            )
+    return table_path
+
+
+def print_summary(results: dict[str, tuple[bool, float, str, dict | None]]) -> None:
+    name_width = max(len("Entity"), *(len(name) for name in results))
+    print("\nSynthesis summary:")
+    print(f"| {'Entity':<{name_width}} | Status | Time [s] | Output")
+    print(f"|-{'-' * name_width}-|--------|----------|-------")
+    for name, (success, elapsed, output, _) in results.items():
+        status = "PASSED" if success else "FAILED"
+        print(f"| {name:<{name_width}} | {status} | {elapsed:>8.1f} | {output}")
 
 
 if __name__ == "__main__":
@@ -37,13 +321,14 @@ if __name__ == "__main__":
     parser.add_argument(
         "directory",
         type=Path,
+        nargs="?",
         help="Relative path to the directory which contains the VHDL file with the same name.",
     )
     parser.add_argument(
         "synthesis_command",
         type=str,
         nargs="*",
-        default=["prep"],
+        default=None,
         help="Synthesis command to be passed to Yosys, such as 'prep', 'synth_xilinx' etc.",
     )
     parser.add_argument(
@@ -51,50 +336,128 @@ if __name__ == "__main__":
         action=argparse.BooleanOptionalAction,
         help="Generate SVG file with the synthesized netlist.",
     )
+    parser.add_argument(
+        "--hierarchical",
+        action="store_true",
+        help="Render each module of the netlist into its own SVG (cached by module hash) "
+        "along with an index, instead of a single SVG of the whole netlist. The design is "
+        "synthesized without flattening (-flatten is dropped, -noflatten added where needed).",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help=f"Synthesize all entities found within '{SOURCE_DIRECTORY}' directory.",
+    )
+    parser.add_argument(
+        "--directories",
+        type=Path,
+        nargs="+",
+        default=[],
+        help="Relative paths to multiple entity directories to synthesize in a batch.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of entities to synthesize in parallel in batch mode.",
+    )
+    parser.add_argument(
+        "--library",
+        action="store_true",
+        help="Analyse the VHDL files into a persistent GHDL library (only those which changed) "
+        "and elaborate the entities from it.",
+    )
+    parser.add_argument(
+        "-g",
+        "--generic",
+        type=str,
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Override a generic of the top entity (can be used multiple times).",
+    )
+    parser.add_argument(
+        "--sweep",
+        type=str,
+        action="append",
+        default=[],
+        metavar="NAME=VALUE1,VALUE2,...",
+        help="Synthesize the entity for every combination of the given generic values "
+        "(can be used multiple times) and write a CSV table of the results.",
+    )
     parser.set_defaults(generate_svg=True)
     args = parser.parse_args()
 
-    synthesis_command = " ".join(args.synthesis_command)
-    vhd_file_path: Path = args.directory / (args.directory.name + ".vhd")
-    vhd_file_paths: list[Path] = list(Path("source").glob("**/*.vhd"))
-    svg_file_path: Path = args.directory / (args.directory.name + "_netlist.svg")
-    json_file_name = f"{svg_file_path.parent}/{vhd_file_path.stem}.json"
-    run_command(
-        [
-            YOSYS_PATH,
-            "-p",
-            f"ghdl --std=08 --no-formal --work=work {' '.join(str(path) for path in vhd_file_paths)} --work=work -e {vhd_file_path.stem}",
-            "-p",
-            f"hierarchy -top {vhd_file_path.stem}",
-            "-p",
-            "proc",
-            "-p",
-            f"{synthesis_command} -top {vhd_file_path.stem}",
-            "-p",
-            f"write_json {json_file_name}",
-            "-p",
-            "stat",
-        ]
-    )
+    batch_mode = args.all or args.directories or args.sweep
+    if batch_mode and args.directory and not args.directory.is_dir():
+        # `synthesize.py --all synth_xilinx` - the first positional argument is a synthesis command
+        args.synthesis_command = [str(args.directory)] + (args.synthesis_command or [])
+        args.directory = None
+    synthesis_command = " ".join(args.synthesis_command or ["prep"])
+    generics = dict(generic.split("=", 1) for generic in args.generic)
 
-    if not args.generate_svg:
-        sys.exit(0)  # Exit early if SVG generation is disabled
+    if args.library:
+        try:
+            update_library(GHDL_PATH, list(SOURCE_DIRECTORY.glob("**/*.vhd")))
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Error: GHDL library could not be updated: {e}")
+            sys.exit(1)
 
-    run_command(
-        [
-            NETLISTSVG_PATH,
-            f"{json_file_name}",
-            "-o",
-            f"{svg_file_path.as_posix()}",
-            f"--skin {NETLISTSVG_SKIN_PATH}",
-        ]
-    )
-    print(f"Created: {svg_file_path}")
+    if batch_mode:
+        # In batch mode, the positional directory (if any) is just another entity to synthesize
+        directories = find_all_entity_directories() if args.all else []
+        directories += args.directories + ([args.directory] if args.directory else [])
+        directories = list(dict.fromkeys(directories))
+
+        generic_grid = [generics]
+        if args.sweep:
+            generic_grid = expand_generic_grid(args.sweep, generics)
+            if args.generate_svg:
+                # All points of the sweep would overwrite the same netlist SVG
+                print("Sweep mode: netlist SVGs are not generated.")
+                args.generate_svg = False
+
+        jobs = [(directory, point) for directory in directories for point in generic_grid]
+        results = synthesize_all(
+            jobs,
+            synthesis_command,
+            args.generate_svg,
+            args.jobs,
+            args.library,
+            args.hierarchical,
+        )
+        print_summary(results)
+
+        if args.sweep:
+            generic_names = list(generic_grid[0])
+            for directory in directories:
+                table_path = write_sweep_table(directory, results, generic_names)
+                print(f"Created: {table_path}")
+
+        sys.exit(0 if all(result[0] for result in results.values()) else 1)
+
+    if args.directory is None:
+        parser.error("the following arguments are required: directory (or --all)")
+
+    try:
+        synthesize(
+            args.directory,
+            synthesis_command,
+            args.generate_svg,
+            args.directory,
+            use_library=args.library,
+            generics=generics,
+            hierarchical=args.hierarchical,
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"Error: {e}")
+        print(f"Command: {' '.join(e.cmd)}")
+        print(f"Exit code: {e.returncode}")
+        sys.exit(e.returncode)
 
     # Remove JSON netlist
-    json_file_path = Path(json_file_name)
+    json_file_path = args.directory / f"{args.directory.name}.json"
     if json_file_path.exists():
         json_file_path.unlink()
         print(f"Removed: {json_file_path}")
-
-    add_white_background(svg_file_path)
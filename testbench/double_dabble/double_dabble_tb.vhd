@@ -1,33 +1,35 @@
 library ieee;
     use ieee.std_logic_1164.all;
     use ieee.numeric_std.all;
-    use ieee.math_real.all;
     use work.bcd_array_package.all;
     use work.bcd_conversion_package.all;
-    use work.utilities_package.all;
+
+library std;
+    use std.textio.all;
 
 library vunit_lib;
     context vunit_lib.vunit_context;
 
 entity double_dabble_tb is
     generic (
-        RUNNER_CFG : string;
-        BINARY     : natural := 1234
+        RUNNER_CFG   : string;
+        BINARY_WIDTH : natural := 4;
+        VECTOR_FILE  : string  := "" --! Written by `scripts/helpers/bcd_model.py`
     );
 end entity double_dabble_tb;
 
 architecture tb of double_dabble_tb is
 
-    -- Generic parameters, min. values are because of limitations of the double_dabble entity
-    constant BCD_DIGITS   : natural := maximum(get_decimal_size(BINARY), 2);
-    constant BINARY_WIDTH : natural := maximum(get_binary_width(BINARY), 4);
+    -- `BINARY_WIDTH` must be at least 4 because of limitations of the double_dabble entity
+    constant BCD_DIGITS : natural := get_decimal_size(2 ** BINARY_WIDTH - 1);
+    constant HEX_DIGITS : natural := (BINARY_WIDTH + 3) / 4;
 
     signal   clk        : std_logic := '0';
     constant CLK_PERIOD : time      := 20 ns;
 
     signal convert, reset : std_logic                           := '0';
     signal done,    ready : std_logic;
-    signal binary_vector  : unsigned(BINARY_WIDTH - 1 downto 0) := to_unsigned(BINARY, BINARY_WIDTH);
+    signal binary_vector  : unsigned(BINARY_WIDTH - 1 downto 0) := (others => '0');
     signal bcd_array      : t_bcd_array(BCD_DIGITS - 1 downto 0);
 
 begin
@@ -52,40 +54,64 @@ begin
 
     proc_test_runner : process is
 
-        variable v_result : natural := 0;
+        file     vectors      : text;
+        variable v_line       : line;
+        variable v_binary     : std_logic_vector(HEX_DIGITS * 4 - 1 downto 0);
+        variable v_expected   : std_logic_vector(BCD_DIGITS * 4 - 1 downto 0);
+        variable v_actual     : std_logic_vector(BCD_DIGITS * 4 - 1 downto 0);
+        variable v_vector_cnt : natural := 0;
 
     begin
 
         test_runner_setup(runner, RUNNER_CFG);
 
-        show(get_logger(default_checker), display_handler, pass);
-
         check_equal(ready, '1', "Check initial value of `o_ready`");
         check_equal(done, '0', "Check initial value of `o_done`");
 
-        convert <= '1';
+        file_open(vectors, VECTOR_FILE, read_mode);
+
+        -- Each line holds the input and the expected BCD digits, both as hex digits. The conversions
+        -- run back to back, the next one starts in the cycle in which the previous one is done.
+        while not endfile(vectors) loop
+
+            readline(vectors, v_line);
+            hread(v_line, v_binary);
+            hread(v_line, v_expected);
+
+            binary_vector <= resize(unsigned(v_binary), BINARY_WIDTH);
+            convert       <= '1';
+
+            wait until rising_edge(clk);
+
+            convert <= '0';
+
+            -- Conversion time is `BINARY_WIDTH - 1` clock cycles
+            wait until rising_edge(clk) and done = '1' for BINARY_WIDTH * CLK_PERIOD;
+
+            if (done /= '1' or ready /= '1') then
+                check_equal(done, '1', "Check value of `o_done` after conversion of 0x" & to_hstring(v_binary));
+                check_equal(ready, '1', "Check value of `o_ready` after conversion of 0x" & to_hstring(v_binary));
+            end if;
 
-        wait until rising_edge(clk);
-        wait for 1 ns;
+            for digit in BCD_DIGITS - 1 downto 0 loop
 
-        check_equal(ready, '0', "Check value of `o_ready`");
+                v_actual(digit * 4 + 3 downto digit * 4) := std_logic_vector(bcd_array(digit));
 
-        -- conversion time is `BINARY_WIDTH - 1` clock cycles, wait for one less because the first occured above
-        wait for (BINARY_WIDTH - 2) * CLK_PERIOD;
-        wait for 1 ns;
+            end loop;
 
-        for d in 0 to BCD_DIGITS - 1 loop
+            -- The checks only run on a mismatch, to keep long vector files fast
+            if (v_actual /= v_expected) then
+                check_equal(v_actual, v_expected, "Check conversion of 0x" & to_hstring(v_binary));
+            end if;
 
-            v_result := v_result + (10 ** d) * to_integer(bcd_array(d));
+            v_vector_cnt := v_vector_cnt + 1;
 
         end loop;
 
-        check_equal(v_result, BINARY, "Check conversion result");
-        check_equal(done, '1', "Check value of `o_done`");
-        check_equal(ready, '1', "Check value of `o_ready`");
+        file_close(vectors);
 
-        wait until rising_edge(clk);
-        wait until rising_edge(clk);
+        check(v_vector_cnt > 0, "Check that the vector file is not empty");
+        info("Checked " & integer'image(v_vector_cnt) & " vectors from " & VECTOR_FILE);
 
         test_runner_cleanup(runner); -- Simulation ends here
 
@@ -1,14 +1,10 @@
+from helpers.bcd_model import add_vector_configs
+
+
 def configure(testbench) -> None:
     """Argument `testbench` is of type `vunit.ui.testbench.TestBench`, but for some reason
     it cannot be imported."""
 
-    for binary in [
-        0,
-        1,
-        9,
-        10,
-        99,
-        999_999,
-        1_000_000,
-    ]:
-        testbench.add_config(name=f"BINARY={binary}", generics={"BINARY": binary})
+    # Each conversion takes `BINARY_WIDTH - 1` clock cycles, so the wider inputs are sampled
+    add_vector_configs(testbench, [4, 8, 12])
+    add_vector_configs(testbench, [20, 30], count=20_000)
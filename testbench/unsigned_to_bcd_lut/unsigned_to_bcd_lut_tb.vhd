@@ -1,27 +1,30 @@
 library ieee;
     use ieee.std_logic_1164.all;
-    use ieee.math_real.floor;
     use ieee.numeric_std.all;
     use work.bcd_conversion_package.all;
     use work.bcd_array_package.all;
-    use work.utilities_package.all;
+
+library std;
+    use std.textio.all;
 
 library vunit_lib;
     context vunit_lib.vunit_context;
 
 entity unsigned_to_bcd_lut_tb is
     generic (
-        RUNNER_CFG : string;
-        DECIMAL    : natural := 0
+        RUNNER_CFG   : string;
+        BINARY_WIDTH : natural := 4;
+        VECTOR_FILE  : string  := "" --! Written by `scripts/helpers/bcd_model.py`
     );
 end entity unsigned_to_bcd_lut_tb;
 
 architecture tb of unsigned_to_bcd_lut_tb is
 
-    constant BINARY_WIDTH : natural                             := get_binary_width(DECIMAL);
-    constant DIGITS       : natural                             := get_decimal_size(2 ** BINARY_WIDTH - 1);
-    signal   binary       : unsigned(BINARY_WIDTH - 1 downto 0) := to_unsigned(DECIMAL, BINARY_WIDTH);
-    signal   bcd_array    : t_bcd_array(DIGITS - 1 downto 0)    := (others => "XXXX");
+    constant DIGITS     : natural := get_decimal_size(2 ** BINARY_WIDTH - 1);
+    constant HEX_DIGITS : natural := (BINARY_WIDTH + 3) / 4;
+
+    signal binary    : unsigned(BINARY_WIDTH - 1 downto 0) := (others => '0');
+    signal bcd_array : t_bcd_array(DIGITS - 1 downto 0);
 
 begin
 
@@ -37,25 +40,53 @@ begin
 
     proc_test_runner : process is
 
-        variable v_result : natural := 0;
+        file     vectors      : text;
+        variable v_line       : line;
+        variable v_binary     : std_logic_vector(HEX_DIGITS * 4 - 1 downto 0);
+        variable v_expected   : std_logic_vector(DIGITS * 4 - 1 downto 0);
+        variable v_actual     : std_logic_vector(DIGITS * 4 - 1 downto 0);
+        variable v_vector_cnt : natural := 0;
 
     begin
 
         test_runner_setup(runner, RUNNER_CFG);
 
-        show(get_logger(default_checker), display_handler, pass);
+        file_open(vectors, VECTOR_FILE, read_mode);
+
+        -- Each line holds the input and the expected BCD digits, both as hex digits
+        while not endfile(vectors) loop
+
+            readline(vectors, v_line);
+            hread(v_line, v_binary);
+            hread(v_line, v_expected);
+
+            binary <= resize(unsigned(v_binary), BINARY_WIDTH);
 
-        bcd_array <= unsigned_to_bcd(binary);
+            wait for 1 ns;
 
-        wait for 1 ns;
+            for digit in DIGITS - 1 downto 0 loop
 
-        for digit in DIGITS - 1 downto 0 loop
+                v_actual(digit * 4 + 3 downto digit * 4) := std_logic_vector(bcd_array(digit));
 
-            v_result := v_result + (10 ** digit) * to_integer(bcd_array(digit));
+            end loop;
+
+            -- The checks only run on a mismatch, to keep millions of vectors fast
+            if (v_actual /= v_expected) then
+                check_equal(v_actual, v_expected, "Check conversion of 0x" & to_hstring(v_binary));
+            end if;
+
+            if (bcd_to_natural(bcd_array) /= to_integer(binary)) then
+                check_equal(bcd_to_natural(bcd_array), to_integer(binary), "Check `bcd_to_natural`");
+            end if;
+
+            v_vector_cnt := v_vector_cnt + 1;
 
         end loop;
 
-        check_equal(v_result, DECIMAL, "Check conversion result");
+        file_close(vectors);
+
+        check(v_vector_cnt > 0, "Check that the vector file is not empty");
+        info("Checked " & integer'image(v_vector_cnt) & " vectors from " & VECTOR_FILE);
 
         test_runner_cleanup(runner); -- Simulation ends here
 
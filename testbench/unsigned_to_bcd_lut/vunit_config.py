@@ -1,6 +1,11 @@
+from helpers.bcd_model import add_vector_configs
+
+
 def configure(testbench) -> None:
     """Argument `testbench` is of type `vunit.ui.testbench.TestBench`, but for some reason
     it cannot be imported."""
 
-    for decimal in [0, 1, 9, 10, 99, 100, 999_999, 1_000_000]:
-        testbench.add_config(name=f"DECIMAL={decimal}", generics={"DECIMAL": decimal})
+    # Every input of the smaller widths, a random sample of the widest one (VHDL integers
+    # limit the width to 30 bits)
+    add_vector_configs(testbench, [1, 4, 8, 12, 16, 20])
+    add_vector_configs(testbench, [30], count=1_000_000)